@@ -3,62 +3,72 @@ Company Research System - LangGraph Demo (No API Required)
 This demonstrates how LangGraph can orchestrate complex company research workflows
 """
 
-from typing import TypedDict, Literal, List, Dict, Any, Annotated
+from typing import Literal, List, Dict, Set, Any, Annotated
+from dataclasses import dataclass, field
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from datetime import datetime
+import io
 import json
 import operator
-from IPython.display import Image, display
+import os
+from itertools import accumulate, islice
+from statistics import fmean
 import random
+from graph_utils import save_graph_png
 
 # Define the state that flows between agents
-class CompanyResearchState(TypedDict):
+@dataclass(slots=True)
+class CompanyResearchState:
     company_name: str
-    ticker: str
-    research_objective: str
+    ticker: str = ""
+    research_objective: str = ""
+    company_record: Dict[str, Any] = field(default_factory=dict)
     
     # Financial data
-    financial_metrics: Dict[str, Any]
-    revenue_trends: List[Dict]
-    profitability_analysis: str
+    financial_metrics: Dict[str, Any] = field(default_factory=dict)
+    revenue_trends: List[Dict] = field(default_factory=list)
+    profitability_analysis: str = ""
     
     # Market position
-    market_share: float
-    competitors: List[str]
-    competitive_advantages: List[str]
-    competitive_risks: List[str]
+    market_share: float = 0.0
+    competitors: List[str] = field(default_factory=list)
+    competitive_advantages: List[str] = field(default_factory=list)
+    competitive_risks: List[str] = field(default_factory=list)
     
     # News and sentiment
-    recent_news: List[Dict]
-    sentiment_score: float
-    key_events: List[str]
+    recent_news: List[Dict] = field(default_factory=list)
+    sentiment_score: float = 0.0
+    key_events: List[str] = field(default_factory=list)
     
     # Leadership and culture
-    leadership_info: Dict[str, Any]
-    company_culture: str
-    employee_sentiment: float
+    leadership_info: Dict[str, Any] = field(default_factory=dict)
+    company_culture: str = ""
+    employee_sentiment: float = 0.0
     
     # Technology and innovation
-    tech_stack: List[str]
-    patents: List[str]
-    rd_investments: float
+    tech_stack: List[str] = field(default_factory=list)
+    patents: List[str] = field(default_factory=list)
+    rd_investments: float = 0.0
     
     # ESG and risks
-    esg_score: Dict[str, float]
-    risk_factors: List[str]
-    regulatory_issues: List[str]
+    esg_score: Dict[str, float] = field(default_factory=dict)
+    esg_composite: float = 0.5
+    risk_factors: List[str] = field(default_factory=list)
+    regulatory_issues: List[str] = field(default_factory=list)
     
     # Final outputs
-    investment_recommendation: str
-    executive_summary: str
-    detailed_report: str
-    confidence_score: float
+    investment_recommendation: str = ""
+    executive_summary: str = ""
+    detailed_report: str = ""
+    confidence_score: float = 0.0
     
     # Workflow management
-    messages: Annotated[List[str], operator.add]
-    errors: List[str]
-    data_sources: List[str]
-    research_depth: Literal["quick", "standard", "deep"]
+    messages: Annotated[List[str], operator.add] = field(default_factory=list)
+    errors: Annotated[List[str], operator.add] = field(default_factory=list)
+    to_enhance: List[str] = field(default_factory=list)
+    data_sources: Annotated[Set[str], operator.or_] = field(default_factory=set)
+    research_depth: Literal["quick", "standard", "deep"] = "standard"
 
 # Simulate company data for demo
 COMPANY_DATA = {
@@ -91,479 +101,627 @@ COMPANY_DATA = {
     }
 }
 
+# Years covered by the generated revenue trend
+REVENUE_TREND_YEARS = range(2021, 2024)
+
+# Closed label sets, shared so every news item and lookup uses the same objects
+POSITIVE, NEUTRAL, NEGATIVE = 'positive', 'neutral', 'negative'
+HIGH, MEDIUM, LOW = 'high', 'medium', 'low'
+STABILITY_LEVELS = (HIGH, MEDIUM, LOW)
+
+# Headline templates by sentiment; the company name is prefixed at generation
+NEWS_TEMPLATES = {
+    POSITIVE: (
+        "Reports Record Quarterly Earnings",
+        "Launches Revolutionary New Product",
+        "Expands into New Markets"
+    ),
+    NEUTRAL: (
+        "Announces Executive Changes",
+        "Updates Product Roadmap",
+        "Participates in Industry Conference"
+    ),
+    NEGATIVE: (
+        "Faces Supply Chain Challenges",
+        "Under Regulatory Scrutiny",
+        "Reports Lower Than Expected Growth"
+    )
+}
+
+# Sentiment draw for generated news, biased towards positive
+NEWS_SENTIMENTS = (POSITIVE, NEUTRAL, NEGATIVE)
+NEWS_SENTIMENT_WEIGHTS = (2, 1, 1)
+
+# Numeric weight of each news sentiment label
+SENTIMENT_VALUES = {POSITIVE: 1.0, NEUTRAL: 0.5, NEGATIVE: 0.0}
+
+# Competitive advantages by company
+ADVANTAGES_POOL = {
+    "Apple Inc.": (
+        "Premium brand positioning",
+        "Integrated ecosystem",
+        "Strong customer loyalty",
+        "Innovation in chip design"
+    ),
+    "Tesla": (
+        "First-mover advantage in EVs",
+        "Vertical integration",
+        "Supercharger network",
+        "Software and AI capabilities"
+    ),
+    "Amazon": (
+        "Dominant e-commerce platform",
+        "AWS cloud leadership",
+        "Prime membership ecosystem",
+        "Logistics infrastructure"
+    )
+}
+
+# Company culture by company
+CULTURE_PROFILES = {
+    "Apple Inc.": "Innovation-focused with emphasis on design excellence and user experience",
+    "Tesla": "Mission-driven culture focused on sustainable energy and rapid innovation",
+    "Amazon": "Customer-obsessed with high performance standards and data-driven decisions"
+}
+
+# Tech stacks by company
+TECH_PROFILES = {
+    "Apple Inc.": ("Swift/Objective-C", "Machine Learning", "Custom Silicon", "AR/VR"),
+    "Tesla": ("AI/Autopilot", "Battery Technology", "Manufacturing Automation", "OTA Updates"),
+    "Amazon": ("AWS Infrastructure", "Machine Learning", "Robotics", "Voice AI")
+}
+
+# Risk factors by industry
+RISK_PROFILES = {
+    "Technology": (
+        "Data privacy regulations",
+        "Cybersecurity threats",
+        "Supply chain dependencies"
+    ),
+    "Automotive/Energy": (
+        "Environmental regulations",
+        "Raw material availability",
+        "Technology disruption"
+    ),
+    "E-commerce/Cloud": (
+        "Antitrust regulations",
+        "Data center energy usage",
+        "Labor relations"
+    )
+}
+
+# Simulated metric ranges as (low, high, decimals)
+FINANCIAL_METRIC_RANGES = {
+    'revenue_growth': (0.05, 0.25, 2),
+    'profit_margin': (0.10, 0.30, 2),
+    'debt_to_equity': (0.3, 1.2, 2),
+    'current_ratio': (1.2, 2.5, 2),
+    'pe_ratio': (15, 35, 1)
+}
+
+LEADERSHIP_METRIC_RANGES = {
+    'board_independence': (0.6, 0.9, 2),
+    'insider_ownership': (0.05, 0.25, 2)
+}
+
+ESG_SCORE_RANGES = {
+    'environmental': (0.60, 0.90, 2),
+    'social': (0.65, 0.90, 2),
+    'governance': (0.70, 0.95, 2)
+}
+
+def draw_metrics(ranges: Dict[str, tuple]) -> Dict[str, float]:
+    """Draws every metric in a range table in one pass"""
+    uniform = random.uniform
+    return {
+        metric: round(uniform(low, high), decimals)
+        for metric, (low, high, decimals) in ranges.items()
+    }
+
+# Recommendation weights for financial growth, market share, sentiment,
+# ESG composite and R&D intensity, and the analyst producing each component
+SCORE_WEIGHTS = (2, 2, 1, 1, 3)
+SCORE_ANALYSTS = (
+    "financial_analyst",
+    "market_analyst",
+    "news_sentiment_analyst",
+    "esg_risk_analyst",
+    "technology_innovation_analyst"
+)
+
+# Scores the STRONG BUY, BUY and HOLD recommendations must beat at each
+# depth. Quick research scores only growth and market share, so its scores
+# run lower and it has thresholds of its own.
+RECOMMENDATION_THRESHOLDS = {
+    "quick": (0.25, 0.20, 0.10),
+    "standard": (0.75, 0.60, 0.45)
+}
+RECOMMENDATION_THRESHOLDS["deep"] = RECOMMENDATION_THRESHOLDS["standard"]
+
 # Define specialized agent nodes
 
-def company_identifier(state: CompanyResearchState) -> CompanyResearchState:
+def company_identifier(state: CompanyResearchState) -> Dict[str, Any]:
     """Identifies and validates the company, gets basic info"""
-    print(f"🏢 Company Identifier: Researching {state['company_name']}...")
+    print(f"🏢 Company Identifier: Researching {state.company_name}...")
     
     # Get company data if available
-    company_info = COMPANY_DATA.get(state['company_name'], {})
+    company_info = COMPANY_DATA.get(state.company_name, {})
     
     if company_info:
-        state['ticker'] = company_info['ticker']
-        state['messages'].append(f"✓ Identified {state['company_name']} (Ticker: {company_info['ticker']})")
-        state['messages'].append(f"  Industry: {company_info['industry']}")
-        state['messages'].append(f"  Founded: {company_info['founded']}")
+        ticker = company_info['ticker']
+        messages = [
+            f"✓ Identified {state.company_name} (Ticker: {company_info['ticker']})",
+            f"  Industry: {company_info['industry']}",
+            f"  Founded: {company_info['founded']}"
+        ]
     else:
-        state['ticker'] = 'UNKNOWN'
-        state['messages'].append(f"⚠️ Limited data available for {state['company_name']}")
-    
-    state['data_sources'].append('Company Database')
-    return state
+        ticker = 'UNKNOWN'
+        messages = [f"⚠️ Limited data available for {state.company_name}"]
+    
+    # Resolved once here so downstream analysts don't repeat the lookup
+    return {
+        'ticker': ticker,
+        'company_record': company_info,
+        'messages': messages,
+        'data_sources': {'Company Database'}
+    }
 
-def financial_analyst(state: CompanyResearchState) -> CompanyResearchState:
+def financial_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes financial metrics and performance"""
     print("💰 Financial Analyst: Analyzing financial data...")
     
-    company_info = COMPANY_DATA.get(state['company_name'], {})
+    company_info = state.company_record
     base_revenue = company_info.get('revenue', 1000000000)
     
     # Generate realistic financial metrics
-    state['financial_metrics'] = {
+    financial_metrics = {
         'revenue': base_revenue,
-        'revenue_growth': round(random.uniform(0.05, 0.25), 2),
-        'profit_margin': round(random.uniform(0.10, 0.30), 2),
-        'debt_to_equity': round(random.uniform(0.3, 1.2), 2),
-        'current_ratio': round(random.uniform(1.2, 2.5), 2),
-        'pe_ratio': round(random.uniform(15, 35), 1),
+        **draw_metrics(FINANCIAL_METRIC_RANGES),
         'market_cap': company_info.get('market_cap', base_revenue * 10)
     }
     
-    # Generate revenue trends
-    current_revenue = base_revenue
-    state['revenue_trends'] = []
-    for year in range(2021, 2024):
-        growth = random.uniform(-0.05, 0.20)
-        current_revenue = int(current_revenue * (1 + growth))
-        state['revenue_trends'].append({
-            'year': year,
-            'revenue': current_revenue,
-            'growth': round(growth * 100, 1)
-        })
+    # Generate revenue trends: draw all growth rates up front, then compound
+    growths = [random.uniform(-0.05, 0.20) for _ in REVENUE_TREND_YEARS]
+    revenues = accumulate(growths, lambda revenue, growth: int(revenue * (1 + growth)), initial=base_revenue)
+    revenue_trends = [
+        {'year': year, 'revenue': revenue, 'growth': round(growth * 100, 1)}
+        for year, revenue, growth in zip(REVENUE_TREND_YEARS, islice(revenues, 1, None), growths)
+    ]
     
     # Analysis based on metrics
-    if state['financial_metrics']['revenue_growth'] > 0.15:
-        state['profitability_analysis'] = "Strong revenue growth with expanding margins"
-    elif state['financial_metrics']['revenue_growth'] > 0.08:
-        state['profitability_analysis'] = "Steady growth with stable profitability"
+    if financial_metrics['revenue_growth'] > 0.15:
+        profitability_analysis = "Strong revenue growth with expanding margins"
+    elif financial_metrics['revenue_growth'] > 0.08:
+        profitability_analysis = "Steady growth with stable profitability"
     else:
-        state['profitability_analysis'] = "Moderate growth, focusing on efficiency"
-    
-    state['messages'].append(f"✓ Financial Analysis Complete:")
-    state['messages'].append(f"  Revenue: ${base_revenue/1e9:.1f}B")
-    state['messages'].append(f"  Growth Rate: {state['financial_metrics']['revenue_growth']*100:.0f}%")
-    state['messages'].append(f"  P/E Ratio: {state['financial_metrics']['pe_ratio']}")
-    
-    state['data_sources'].append('Financial APIs')
-    return state
+        profitability_analysis = "Moderate growth, focusing on efficiency"
+    
+    # Return only the keys this analyst owns so parallel branches don't collide
+    return {
+        'financial_metrics': financial_metrics,
+        'revenue_trends': revenue_trends,
+        'profitability_analysis': profitability_analysis,
+        'messages': [
+            "✓ Financial Analysis Complete:",
+            f"  Revenue: ${base_revenue/1e9:.1f}B",
+            f"  Growth Rate: {financial_metrics['revenue_growth']*100:.0f}%",
+            f"  P/E Ratio: {financial_metrics['pe_ratio']}"
+        ],
+        'data_sources': {'Financial APIs'}
+    }
 
-def market_analyst(state: CompanyResearchState) -> CompanyResearchState:
+def market_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes market position and competition"""
     print("📊 Market Analyst: Evaluating market position...")
     
-    company_info = COMPANY_DATA.get(state['company_name'], {})
+    company_info = state.company_record
     
     # Get competitors
-    state['competitors'] = company_info.get('competitors', ['Competitor A', 'Competitor B', 'Competitor C'])
+    competitors = company_info.get('competitors', ['Competitor A', 'Competitor B', 'Competitor C'])
     
     # Calculate market share based on company size
-    if state['company_name'] in ["Apple Inc.", "Microsoft", "Amazon"]:
-        state['market_share'] = round(random.uniform(0.20, 0.35), 2)
+    if state.company_name in ["Apple Inc.", "Microsoft", "Amazon"]:
+        market_share = round(random.uniform(0.20, 0.35), 2)
     else:
-        state['market_share'] = round(random.uniform(0.05, 0.20), 2)
+        market_share = round(random.uniform(0.05, 0.20), 2)
     
     # Generate competitive advantages based on company
-    advantages_pool = {
-        "Apple Inc.": [
-            "Premium brand positioning",
-            "Integrated ecosystem",
-            "Strong customer loyalty",
-            "Innovation in chip design"
-        ],
-        "Tesla": [
-            "First-mover advantage in EVs",
-            "Vertical integration",
-            "Supercharger network",
-            "Software and AI capabilities"
-        ],
-        "Amazon": [
-            "Dominant e-commerce platform",
-            "AWS cloud leadership",
-            "Prime membership ecosystem",
-            "Logistics infrastructure"
-        ]
-    }
-    
-    state['competitive_advantages'] = advantages_pool.get(
-        state['company_name'], 
-        ["Market leadership", "Strong brand", "Innovation capability"]
+    competitive_advantages = ADVANTAGES_POOL.get(
+        state.company_name,
+        ("Market leadership", "Strong brand", "Innovation capability")
     )[:3]
     
-    state['competitive_risks'] = [
+    competitive_risks = [
         "Increasing competition",
         "Market saturation",
         "Regulatory pressures"
     ]
-    
-    state['messages'].append(f"✓ Market Analysis Complete:")
-    state['messages'].append(f"  Market Share: {state['market_share']*100:.0f}%")
-    state['messages'].append(f"  Main Competitors: {', '.join(state['competitors'][:2])}")
-    
-    state['data_sources'].append('Industry Reports')
-    return state
 
-def news_sentiment_analyst(state: CompanyResearchState) -> CompanyResearchState:
-    """Analyzes recent news and market sentiment"""
-    print("📰 News Analyst: Tracking news and sentiment...")
-    
-    # Generate realistic news based on company
-    news_templates = {
-        "positive": [
-            f"{state['company_name']} Reports Record Quarterly Earnings",
-            f"{state['company_name']} Launches Revolutionary New Product",
-            f"{state['company_name']} Expands into New Markets"
-        ],
-        "neutral": [
-            f"{state['company_name']} Announces Executive Changes",
-            f"{state['company_name']} Updates Product Roadmap",
-            f"{state['company_name']} Participates in Industry Conference"
+    return {
+        'competitors': competitors,
+        'market_share': market_share,
+        'competitive_advantages': list(competitive_advantages),
+        'competitive_risks': competitive_risks,
+        'messages': [
+            "✓ Market Analysis Complete:",
+            f"  Market Share: {market_share*100:.0f}%",
+            f"  Main Competitors: {', '.join(competitors[:2])}"
         ],
-        "negative": [
-            f"{state['company_name']} Faces Supply Chain Challenges",
-            f"{state['company_name']} Under Regulatory Scrutiny",
-            f"{state['company_name']} Reports Lower Than Expected Growth"
-        ]
+        'data_sources': {'Industry Reports'}
     }
+
+def news_sentiment_analyst(state: CompanyResearchState) -> Dict[str, Any]:
+    """Analyzes recent news and market sentiment"""
+    print("📰 News Analyst: Tracking news and sentiment...")
     
     # Generate mix of news
-    state['recent_news'] = []
-    sentiments = ['positive', 'positive', 'neutral', 'negative']  # Bias towards positive
+    recent_news = []
+    sentiments = random.choices(NEWS_SENTIMENTS, weights=NEWS_SENTIMENT_WEIGHTS, k=3)
     
-    for i in range(3):
-        sentiment = random.choice(sentiments)
-        headline = random.choice(news_templates[sentiment])
-        state['recent_news'].append({
+    for i, sentiment in enumerate(sentiments):
+        event = random.choice(NEWS_TEMPLATES[sentiment])
+        recent_news.append({
             'date': f'2024-01-{15-i*5:02d}',
-            'headline': headline,
+            'headline': f"{state.company_name} {event}",
+            'event': event,
             'sentiment': sentiment,
-            'impact': 'high' if sentiment != 'neutral' else 'low'
+            'impact': HIGH if sentiment != NEUTRAL else LOW
         })
     
     # Calculate overall sentiment
-    sentiment_values = {'positive': 1, 'neutral': 0.5, 'negative': 0}
-    scores = [sentiment_values[news['sentiment']] for news in state['recent_news']]
-    state['sentiment_score'] = sum(scores) / len(scores)
-    
-    state['key_events'] = [
-        news['headline'].split(state['company_name'])[1].strip() 
-        for news in state['recent_news'] 
-        if news['sentiment'] == 'positive'
-    ][:2]
-    
-    state['messages'].append(f"✓ Sentiment Analysis Complete:")
-    state['messages'].append(f"  Overall Sentiment: {state['sentiment_score']*100:.0f}% positive")
-    state['messages'].append(f"  Recent Headlines: {len(state['recent_news'])}")
+    sentiment_score = fmean(SENTIMENT_VALUES[news['sentiment']] for news in recent_news)
     
-    state['data_sources'].append('News APIs')
-    return state
+    key_events = [
+        news['event']
+        for news in recent_news
+        if news['sentiment'] == POSITIVE
+    ][:2]
+
+    return {
+        'recent_news': recent_news,
+        'sentiment_score': sentiment_score,
+        'key_events': key_events,
+        'messages': [
+            "✓ Sentiment Analysis Complete:",
+            f"  Overall Sentiment: {sentiment_score*100:.0f}% positive",
+            f"  Recent Headlines: {len(recent_news)}"
+        ],
+        'data_sources': {'News APIs'}
+    }
 
-def leadership_culture_analyst(state: CompanyResearchState) -> CompanyResearchState:
+def leadership_culture_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes leadership team and company culture"""
     print("👥 Leadership Analyst: Evaluating management and culture...")
     
     # Generate leadership metrics
-    state['leadership_info'] = {
+    leadership_info = {
         'ceo_tenure': random.randint(2, 15),
-        'management_stability': random.choice(['high', 'medium', 'low']),
-        'board_independence': round(random.uniform(0.6, 0.9), 2),
-        'insider_ownership': round(random.uniform(0.05, 0.25), 2)
+        'management_stability': random.choice(STABILITY_LEVELS),
+        **draw_metrics(LEADERSHIP_METRIC_RANGES)
     }
     
     # Company culture based on company type
-    culture_profiles = {
-        "Apple Inc.": "Innovation-focused with emphasis on design excellence and user experience",
-        "Tesla": "Mission-driven culture focused on sustainable energy and rapid innovation",
-        "Amazon": "Customer-obsessed with high performance standards and data-driven decisions"
-    }
-    
-    state['company_culture'] = culture_profiles.get(
-        state['company_name'],
+    company_culture = CULTURE_PROFILES.get(
+        state.company_name,
         "Performance-oriented with focus on growth and innovation"
     )
     
     # Employee sentiment
-    state['employee_sentiment'] = round(random.uniform(0.65, 0.90), 2)
-    
-    state['messages'].append(f"✓ Leadership Analysis Complete:")
-    state['messages'].append(f"  CEO Tenure: {state['leadership_info']['ceo_tenure']} years")
-    state['messages'].append(f"  Employee Satisfaction: {state['employee_sentiment']*100:.0f}%")
-    
-    state['data_sources'].append('Professional Networks')
-    return state
+    employee_sentiment = round(random.uniform(0.65, 0.90), 2)
+    
+    return {
+        'leadership_info': leadership_info,
+        'company_culture': company_culture,
+        'employee_sentiment': employee_sentiment,
+        'messages': [
+            "✓ Leadership Analysis Complete:",
+            f"  CEO Tenure: {leadership_info['ceo_tenure']} years",
+            f"  Employee Satisfaction: {employee_sentiment*100:.0f}%"
+        ],
+        'data_sources': {'Professional Networks'}
+    }
 
-def technology_innovation_analyst(state: CompanyResearchState) -> CompanyResearchState:
+def technology_innovation_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes technology stack and innovation capacity"""
     print("🔬 Tech Analyst: Assessing technology and innovation...")
     
     # Tech stacks by company type
-    tech_profiles = {
-        "Apple Inc.": ["Swift/Objective-C", "Machine Learning", "Custom Silicon", "AR/VR"],
-        "Tesla": ["AI/Autopilot", "Battery Technology", "Manufacturing Automation", "OTA Updates"],
-        "Amazon": ["AWS Infrastructure", "Machine Learning", "Robotics", "Voice AI"]
-    }
-    
-    state['tech_stack'] = tech_profiles.get(
-        state['company_name'],
-        ["Cloud Computing", "Data Analytics", "Mobile Apps", "AI/ML"]
+    tech_stack = TECH_PROFILES.get(
+        state.company_name,
+        ("Cloud Computing", "Data Analytics", "Mobile Apps", "AI/ML")
     )
     
     # Generate patents
-    state['patents'] = [
-        f"Advanced {tech} System" 
-        for tech in state['tech_stack'][:2]
+    patents = [
+        f"Advanced {tech} System"
+        for tech in tech_stack[:2]
     ]
     
     # R&D investment as percentage of revenue
-    state['rd_investments'] = round(random.uniform(0.08, 0.20), 2)
-    
-    state['messages'].append(f"✓ Technology Analysis Complete:")
-    state['messages'].append(f"  Core Technologies: {', '.join(state['tech_stack'][:2])}")
-    state['messages'].append(f"  R&D Investment: {state['rd_investments']*100:.0f}% of revenue")
-    
-    state['data_sources'].append('Patent Databases')
-    return state
+    rd_investments = round(random.uniform(0.08, 0.20), 2)
+    
+    return {
+        'tech_stack': list(tech_stack),
+        'patents': patents,
+        'rd_investments': rd_investments,
+        'messages': [
+            "✓ Technology Analysis Complete:",
+            f"  Core Technologies: {', '.join(tech_stack[:2])}",
+            f"  R&D Investment: {rd_investments*100:.0f}% of revenue"
+        ],
+        'data_sources': {'Patent Databases'}
+    }
 
-def esg_risk_analyst(state: CompanyResearchState) -> CompanyResearchState:
+def esg_risk_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes ESG factors and risk profile"""
     print("🌍 ESG Analyst: Evaluating sustainability and risks...")
     
     # Generate ESG scores
-    state['esg_score'] = {
-        'environmental': round(random.uniform(0.60, 0.90), 2),
-        'social': round(random.uniform(0.65, 0.90), 2),
-        'governance': round(random.uniform(0.70, 0.95), 2)
-    }
-    
-    # Risk factors by industry
-    risk_profiles = {
-        "Technology": [
-            "Data privacy regulations",
-            "Cybersecurity threats",
-            "Supply chain dependencies"
-        ],
-        "Automotive/Energy": [
-            "Environmental regulations",
-            "Raw material availability",
-            "Technology disruption"
-        ],
-        "E-commerce/Cloud": [
-            "Antitrust regulations",
-            "Data center energy usage",
-            "Labor relations"
-        ]
-    }
+    esg_score = draw_metrics(ESG_SCORE_RANGES)
     
-    company_info = COMPANY_DATA.get(state['company_name'], {})
+    company_info = state.company_record
     industry = company_info.get('industry', 'Technology')
     
-    state['risk_factors'] = risk_profiles.get(
+    # Risk factors by industry
+    risk_factors = RISK_PROFILES.get(
         industry.split('/')[0],
-        ["Market competition", "Regulatory changes", "Economic downturn"]
+        ("Market competition", "Regulatory changes", "Economic downturn")
     )
     
-    state['regulatory_issues'] = [
-        risk for risk in state['risk_factors'] 
+    regulatory_issues = [
+        risk for risk in risk_factors
         if 'regulation' in risk.lower()
     ]
     
-    avg_esg = sum(state['esg_score'].values()) / 3
-    state['messages'].append(f"✓ ESG Analysis Complete:")
-    state['messages'].append(f"  Overall ESG Score: {avg_esg*100:.0f}/100")
-    state['messages'].append(f"  Key Risks: {len(state['risk_factors'])}")
-    
-    state['data_sources'].append('ESG Databases')
-    return state
+    # Averaged once here; the synthesizer reads it back from state
+    esg_composite = fmean(esg_score.values())
+    
+    return {
+        'esg_score': esg_score,
+        'esg_composite': esg_composite,
+        'risk_factors': list(risk_factors),
+        'regulatory_issues': regulatory_issues,
+        'messages': [
+            "✓ ESG Analysis Complete:",
+            f"  Overall ESG Score: {esg_composite*100:.0f}/100",
+            f"  Key Risks: {len(risk_factors)}"
+        ],
+        'data_sources': {'ESG Databases'}
+    }
 
-def report_synthesizer(state: CompanyResearchState) -> CompanyResearchState:
+def report_synthesizer(state: CompanyResearchState) -> Dict[str, Any]:
     """Synthesizes all research into comprehensive report"""
     print("📝 Report Synthesizer: Creating comprehensive analysis...")
     
+    financial_metrics = state.financial_metrics
+    esg_score = state.esg_score
+    
+    # Only the analysts this depth runs count towards confidence and the
+    # score; the others' fields hold defaults, not findings
+    analysts = {analyst.__name__ for analyst in DEPTH_ANALYSTS[state.research_depth]}
+    
     # Calculate confidence score
-    data_completeness = [
-        bool(state.get('financial_metrics')),
-        bool(state.get('competitors')),
-        bool(state.get('recent_news')),
-        bool(state.get('leadership_info')),
-        bool(state.get('esg_score')),
-        bool(state.get('tech_stack'))
-    ]
-    state['confidence_score'] = sum(data_completeness) / len(data_completeness)
-    
-    # Calculate overall score for recommendation
-    score_components = {
-        'financial': state.get('financial_metrics', {}).get('revenue_growth', 0.1) * 2,
-        'market': state.get('market_share', 0.1) * 2,
-        'sentiment': state.get('sentiment_score', 0.5),
-        'esg': sum(state.get('esg_score', {}).values()) / 3 if state.get('esg_score') else 0.5,
-        'innovation': state.get('rd_investments', 0.1) * 3
-    }
+    data_completeness = [bool(getattr(state, ANALYST_NODES[analyst])) for analyst in analysts]
+    confidence_score = sum(data_completeness) / len(data_completeness)
+    
+    # Calculate overall score for recommendation, in SCORE_WEIGHTS order
+    score_components = (
+        financial_metrics.get('revenue_growth', 0.1),
+        state.market_share,
+        state.sentiment_score,
+        state.esg_composite,
+        state.rd_investments
+    )
     
-    overall_score = sum(score_components.values()) / len(score_components)
+    # Components from analysts this depth skips are left out of the score
+    overall_score = sum(
+        weight * component
+        for weight, component, analyst in zip(SCORE_WEIGHTS, score_components, SCORE_ANALYSTS)
+        if analyst in analysts
+    ) / len(SCORE_WEIGHTS)
     
     # Generate recommendation
-    if overall_score > 0.75:
-        state['investment_recommendation'] = "STRONG BUY"
+    strong_buy, buy, hold = RECOMMENDATION_THRESHOLDS[state.research_depth]
+    if overall_score > strong_buy:
+        investment_recommendation = "STRONG BUY"
         rec_text = "Exceptional growth potential with strong fundamentals"
-    elif overall_score > 0.60:
-        state['investment_recommendation'] = "BUY"
+    elif overall_score > buy:
+        investment_recommendation = "BUY"
         rec_text = "Solid investment opportunity with good upside"
-    elif overall_score > 0.45:
-        state['investment_recommendation'] = "HOLD"
+    elif overall_score > hold:
+        investment_recommendation = "HOLD"
         rec_text = "Stable investment with moderate growth prospects"
     else:
-        state['investment_recommendation'] = "UNDERWEIGHT"
+        investment_recommendation = "UNDERWEIGHT"
         rec_text = "Consider reducing exposure due to concerns"
     
-    # Generate executive summary
-    state['executive_summary'] = f"""
-📊 EXECUTIVE SUMMARY - {state['company_name']} ({state.get('ticker', 'N/A')})
-{'='*60}
-
-📈 FINANCIAL PERFORMANCE
-• Revenue: ${state.get('financial_metrics', {}).get('revenue', 0)/1e9:.1f}B
-• Growth Rate: {state.get('financial_metrics', {}).get('revenue_growth', 0)*100:.0f}%
-• Profit Margin: {state.get('financial_metrics', {}).get('profit_margin', 0)*100:.0f}%
-• P/E Ratio: {state.get('financial_metrics', {}).get('pe_ratio', 'N/A')}
-
-🏆 MARKET POSITION
-• Market Share: {state.get('market_share', 0)*100:.0f}%
-• Key Competitors: {', '.join(state.get('competitors', [])[:3])}
-
-💡 COMPETITIVE ADVANTAGES
-{chr(10).join(f'• {adv}' for adv in state.get('competitive_advantages', [])[:3])}
-
-📰 MARKET SENTIMENT
-• Sentiment Score: {state.get('sentiment_score', 0)*100:.0f}% positive
-• Recent Developments: {len(state.get('key_events', []))} positive events
-
-🌍 ESG RATING
-• Environmental: {state.get('esg_score', {}).get('environmental', 0)*100:.0f}/100
-• Social: {state.get('esg_score', {}).get('social', 0)*100:.0f}/100
-• Governance: {state.get('esg_score', {}).get('governance', 0)*100:.0f}/100
-
-⚠️ KEY RISKS
-{chr(10).join(f'• {risk}' for risk in state.get('risk_factors', [])[:3])}
-
-💼 INVESTMENT RECOMMENDATION: {state['investment_recommendation']}
-{rec_text}
-
-📊 Research Confidence: {state['confidence_score']*100:.0f}%
-📚 Data Sources: {len(set(state['data_sources']))} verified sources
-"""
+    # Resolve every value once before writing the summary
+    revenue_b = financial_metrics.get('revenue', 0) / 1e9
+    growth_pct = financial_metrics.get('revenue_growth', 0) * 100
+    margin_pct = financial_metrics.get('profit_margin', 0) * 100
+    pe_ratio = financial_metrics.get('pe_ratio', 'N/A')
+    advantages = "\n".join(f'• {adv}' for adv in state.competitive_advantages[:3])
+    risks = "\n".join(f'• {risk}' for risk in state.risk_factors[:3])
     
-    state['messages'].append(f"✓ Report Synthesis Complete")
-    state['messages'].append(f"  Recommendation: {state['investment_recommendation']}")
-    state['messages'].append(f"  Confidence Score: {state['confidence_score']*100:.0f}%")
-    
-    return state
+    # Generate executive summary
+    buf = io.StringIO()
+    buf.write(f"\n📊 EXECUTIVE SUMMARY - {state.company_name} ({state.ticker})\n{'='*60}\n\n")
+    buf.write(
+        f"📈 FINANCIAL PERFORMANCE\n"
+        f"• Revenue: ${revenue_b:.1f}B\n"
+        f"• Growth Rate: {growth_pct:.0f}%\n"
+        f"• Profit Margin: {margin_pct:.0f}%\n"
+        f"• P/E Ratio: {pe_ratio}\n\n"
+    )
+    buf.write(
+        f"🏆 MARKET POSITION\n"
+        f"• Market Share: {state.market_share*100:.0f}%\n"
+        f"• Key Competitors: {', '.join(state.competitors[:3])}\n\n"
+    )
+    buf.write(f"💡 COMPETITIVE ADVANTAGES\n{advantages}\n\n")
+    buf.write(
+        f"📰 MARKET SENTIMENT\n"
+        f"• Sentiment Score: {state.sentiment_score*100:.0f}% positive\n"
+        f"• Recent Developments: {len(state.key_events)} positive events\n\n"
+    )
+    buf.write(
+        f"🌍 ESG RATING\n"
+        f"• Environmental: {esg_score.get('environmental', 0)*100:.0f}/100\n"
+        f"• Social: {esg_score.get('social', 0)*100:.0f}/100\n"
+        f"• Governance: {esg_score.get('governance', 0)*100:.0f}/100\n\n"
+    )
+    buf.write(f"⚠️ KEY RISKS\n{risks}\n\n")
+    buf.write(f"💼 INVESTMENT RECOMMENDATION: {investment_recommendation}\n{rec_text}\n\n")
+    buf.write(
+        f"📊 Research Confidence: {confidence_score*100:.0f}%\n"
+        f"📚 Data Sources: {len(state.data_sources)} verified sources\n"
+    )
+    executive_summary = buf.getvalue()
+    
+    return {
+        'confidence_score': confidence_score,
+        'investment_recommendation': investment_recommendation,
+        'executive_summary': executive_summary,
+        'messages': [
+            "✓ Report Synthesis Complete",
+            f"  Recommendation: {investment_recommendation}",
+            f"  Confidence Score: {confidence_score*100:.0f}%"
+        ]
+    }
 
-def quality_validator(state: CompanyResearchState) -> CompanyResearchState:
+def quality_validator(state: CompanyResearchState) -> Dict[str, Any]:
     """Validates research quality and completeness"""
     print("✅ Quality Validator: Checking research completeness...")
     
     # Check critical data points
     validations = {
-        'Financial Data': bool(state.get('financial_metrics')),
-        'Market Analysis': bool(state.get('competitors')),
-        'News Sentiment': bool(state.get('recent_news')),
-        'Risk Assessment': bool(state.get('risk_factors')),
-        'ESG Analysis': bool(state.get('esg_score'))
+        'Financial Data': bool(state.financial_metrics),
+        'Market Analysis': bool(state.competitors),
+        'News Sentiment': bool(state.recent_news),
+        'Risk Assessment': bool(state.risk_factors),
+        'ESG Analysis': bool(state.esg_score)
     }
     
     missing = [check for check, valid in validations.items() if not valid]
     
     if missing:
-        state['errors'].extend([f"Missing: {item}" for item in missing])
-        state['messages'].append(f"⚠️ Quality Check: {len(missing)} data points missing")
+        check_message = f"⚠️ Quality Check: {len(missing)} data points missing"
     else:
-        state['messages'].append("✅ Quality Check: All critical data points collected")
+        check_message = "✅ Quality Check: All critical data points collected"
     
-    # Add final validation message
-    state['messages'].append(f"✓ Research validation complete")
+    # Analysts that came back empty are the only ones worth re-running
+    to_enhance = [
+        analyst for analyst, output in ANALYST_NODES.items()
+        if not getattr(state, output)
+    ]
     
-    return state
+    # Only new errors are returned; the reducer appends them
+    return {
+        'errors': [f"Missing: {item}" for item in missing],
+        'to_enhance': to_enhance,
+        'messages': [check_message, "✓ Research validation complete"]
+    }
 
 # Routing functions
-def should_enhance_research(state: CompanyResearchState) -> Literal["enhance", "complete"]:
+def should_enhance_research(state: CompanyResearchState) -> List[Send] | str:
     """Determines if additional research is needed"""
-    if state['confidence_score'] < 0.7 and len(state.get('errors', [])) == 0:
-        return "enhance"
-    return "complete"
+    if state.confidence_score < 0.7 and len(state.errors) == 0:
+        # Re-run only the weak analysts; they rejoin at report_synthesizer
+        analyst_input = CompanyResearchState(
+            company_name=state.company_name,
+            company_record=state.company_record
+        )
+        return [Send(analyst, analyst_input) for analyst in state.to_enhance]
+    return END
+
+# Analysts that run in parallel between identification and synthesis,
+# with the state field each one is responsible for filling
+ANALYST_NODES = {
+    "financial_analyst": "financial_metrics",
+    "market_analyst": "competitors",
+    "news_sentiment_analyst": "recent_news",
+    "leadership_culture_analyst": "leadership_info",
+    "technology_innovation_analyst": "tech_stack",
+    "esg_risk_analyst": "esg_score"
+}
+
+# Analysts compiled into the graph for each research depth
+DEPTH_ANALYSTS = {
+    "quick": (financial_analyst, market_analyst),
+    "standard": (
+        financial_analyst,
+        market_analyst,
+        news_sentiment_analyst,
+        leadership_culture_analyst,
+        technology_innovation_analyst,
+        esg_risk_analyst
+    )
+}
+DEPTH_ANALYSTS["deep"] = DEPTH_ANALYSTS["standard"]
 
 # Build the graph
-def create_company_research_graph():
+def create_company_research_graph(depth: Literal["quick", "standard", "deep"] = "standard"):
     builder = StateGraph(CompanyResearchState)
     
-    # Add all nodes
+    # Add only the nodes this depth needs
     builder.add_node("company_identifier", company_identifier)
-    builder.add_node("financial_analyst", financial_analyst)
-    builder.add_node("market_analyst", market_analyst)
-    builder.add_node("news_sentiment_analyst", news_sentiment_analyst)
-    builder.add_node("leadership_culture_analyst", leadership_culture_analyst)
-    builder.add_node("technology_innovation_analyst", technology_innovation_analyst)
-    builder.add_node("esg_risk_analyst", esg_risk_analyst)
+    for analyst in DEPTH_ANALYSTS[depth]:
+        builder.add_node(analyst.__name__, analyst)
     builder.add_node("report_synthesizer", report_synthesizer)
-    builder.add_node("quality_validator", quality_validator)
     
     # Define the flow
     builder.add_edge(START, "company_identifier")
     
-    # Sequential flow to avoid parallel writes
-    builder.add_edge("company_identifier", "financial_analyst")
-    builder.add_edge("financial_analyst", "market_analyst")
-    builder.add_edge("market_analyst", "news_sentiment_analyst")
+    # Fan out: each analyst only reads company_name and writes its own keys,
+    # so they all run concurrently in the same superstep
+    for analyst in DEPTH_ANALYSTS[depth]:
+        builder.add_edge("company_identifier", analyst.__name__)
+        # Convergence at synthesis
+        builder.add_edge(analyst.__name__, "report_synthesizer")
     
-    # Continue with specialized analysis
-    builder.add_edge("news_sentiment_analyst", "leadership_culture_analyst")
-    builder.add_edge("leadership_culture_analyst", "technology_innovation_analyst")
-    builder.add_edge("technology_innovation_analyst", "esg_risk_analyst")
-    
-    # Convergence at synthesis
-    builder.add_edge("esg_risk_analyst", "report_synthesizer")
+    # Quick research stops at the synthesized summary
+    if depth == "quick":
+        builder.add_edge("report_synthesizer", END)
+        return builder.compile()
     
     # Quality validation
+    builder.add_node("quality_validator", quality_validator)
     builder.add_edge("report_synthesizer", "quality_validator")
     
-    # Conditional completion
-    builder.add_conditional_edges(
-        "quality_validator",
-        should_enhance_research,
-        {
-            "enhance": "market_analyst",
-            "complete": END
-        }
-    )
+    # Every analyst always fills its output, so only deep research pays for
+    # the enhancement loop; standard is a straight DAG ending at validation
+    if depth == "deep":
+        builder.add_conditional_edges(
+            "quality_validator",
+            should_enhance_research,
+            [*ANALYST_NODES, END]
+        )
+    else:
+        builder.add_edge("quality_validator", END)
     
     return builder.compile()
 
+# One specialized graph per research depth, compiled at import
+COMPILED_GRAPHS = {depth: create_company_research_graph(depth) for depth in DEPTH_ANALYSTS}
+
+def run_company_research(initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs the graph compiled for the state's research depth"""
+    return COMPILED_GRAPHS[initial_state.get("research_depth", "standard")].invoke(initial_state)
+
 # Demo execution
 if __name__ == "__main__":
-    # Create the research graph
-    graph = create_company_research_graph()
-    
-    # Save visualization
-    try:
-        img = Image(graph.get_graph().draw_mermaid_png())
-        with open("company_research_graph.png", "wb") as f:
-            f.write(img.data)
-        print("📊 Graph visualization saved!")
-    except Exception as e:
-        print(f"Visualization error: {e}")
+    # Standard-depth research graph (compiled at import)
+    graph = COMPILED_GRAPHS["standard"]
+    
+    mermaid = graph.get_graph().draw_mermaid()
+    
+    # Save visualization (opt-in, since rendering calls the mermaid.ink service)
+    if os.getenv("RENDER_GRAPH") == "1":
+        save_graph_png(graph, mermaid, "company_research_graph.png")
     
     # Print Mermaid diagram
     print("\n🎨 Mermaid Diagram:")
-    print(graph.get_graph().draw_mermaid())
+    print(mermaid)
     
     # Run research on companies
     print("\n" + "="*70)
@@ -577,41 +735,14 @@ if __name__ == "__main__":
         print(f"🏢 RESEARCHING: {company_name}")
         print(f"{'='*70}")
         
+        # Everything else starts from the CompanyResearchState defaults
         initial_state = {
             "company_name": company_name,
-            "ticker": "",
-            "research_objective": "Investment analysis",
-            "research_depth": "standard",
-            "financial_metrics": {},
-            "revenue_trends": [],
-            "profitability_analysis": "",
-            "market_share": 0.0,
-            "competitors": [],
-            "competitive_advantages": [],
-            "competitive_risks": [],
-            "recent_news": [],
-            "sentiment_score": 0.0,
-            "key_events": [],
-            "leadership_info": {},
-            "company_culture": "",
-            "employee_sentiment": 0.0,
-            "tech_stack": [],
-            "patents": [],
-            "rd_investments": 0.0,
-            "esg_score": {},
-            "risk_factors": [],
-            "regulatory_issues": [],
-            "investment_recommendation": "",
-            "executive_summary": "",
-            "detailed_report": "",
-            "confidence_score": 0.0,
-            "messages": [],
-            "errors": [],
-            "data_sources": []
+            "research_objective": "Investment analysis"
         }
         
         # Run the research workflow
-        result = graph.invoke(initial_state)
+        result = run_company_research(initial_state)
         
         # Display executive summary
         print(result['executive_summary'])
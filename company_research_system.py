@@ -5,78 +5,129 @@ to gather and analyze data from various sources.
 """
 
 import os
-from typing import TypedDict, Literal, List, Dict, Any, Annotated
+import io
+import asyncio
+from typing import Literal, List, Dict, Any, Annotated, Tuple
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.caches import InMemoryCache
+from pydantic import BaseModel
 from datetime import datetime
+from dataclasses import dataclass, field
+from functools import lru_cache
 import json
 import operator
-from IPython.display import Image, display
 
 # Initialize LLM (you can also use local models)
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# temperature=0 is deterministic, so identical prompts across research runs
+# are answered from the in-process cache instead of another API round-trip.
+# Built on first use so the module imports without OPENAI_API_KEY set.
+@lru_cache(maxsize=None)
+def get_llm() -> ChatOpenAI:
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0, cache=InMemoryCache(maxsize=2048))
 
-# Define the state that flows between agents
-class CompanyResearchState(TypedDict):
+# Define the state that flows between agents. Each analyst owns one domain
+# slice and replaces only that field, instead of writing into one flat record.
+@dataclass(slots=True)
+class FinancialState:
+    metrics: Dict[str, Any] = field(default_factory=dict)
+    revenue_trends: List[Dict] = field(default_factory=list)
+    profitability_analysis: str = ""
+
+@dataclass(slots=True)
+class MarketState:
+    share: float = 0.0
+    competitors: List[str] = field(default_factory=list)
+    advantages: List[str] = field(default_factory=list)
+    risks: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class NewsState:
+    recent_news: List[Dict] = field(default_factory=list)
+    sentiment_score: float = 0.0
+    key_events: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class LeadershipState:
+    info: Dict[str, Any] = field(default_factory=dict)
+    culture: str = ""
+    employee_sentiment: float = 0.0
+
+@dataclass(slots=True)
+class TechnologyState:
+    tech_stack: List[str] = field(default_factory=list)
+    patents: List[str] = field(default_factory=list)
+    rd_investments: float = 0.0
+
+@dataclass(slots=True)
+class ESGState:
+    scores: Dict[str, float] = field(default_factory=dict)
+    composite: float = 0.0
+    risk_factors: List[str] = field(default_factory=list)
+    regulatory_issues: List[str] = field(default_factory=list)
+
+@dataclass(slots=True)
+class CompanyResearchState:
     company_name: str
-    ticker: str
-    research_objective: str
+    research_objective: str = ""
+    research_depth: Literal["quick", "standard", "deep"] = "standard"
+    ticker: str = ""
+    
+    # Analyst outputs, one slice per domain
+    financial: FinancialState = field(default_factory=FinancialState)
+    market: MarketState = field(default_factory=MarketState)
+    news: NewsState = field(default_factory=NewsState)
+    leadership: LeadershipState = field(default_factory=LeadershipState)
+    technology: TechnologyState = field(default_factory=TechnologyState)
+    esg: ESGState = field(default_factory=ESGState)
     
-    # Financial data
-    financial_metrics: Dict[str, Any]
-    revenue_trends: List[Dict]
-    profitability_analysis: str
+    # Final outputs
+    investment_recommendation: str = ""
+    executive_summary: str = ""
+    detailed_report: str = ""
+    confidence_score: float = 0.0
     
-    # Market position
+    # Workflow management
+    messages: Annotated[List, operator.add] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    data_sources: Annotated[List[str], operator.add] = field(default_factory=list)
+
+# Structured output for the single-call analysis used by quick research
+class CompanyResearchSchema(BaseModel):
+    financial_metrics: Dict[str, float]
+    profitability_analysis: str
     market_share: float
     competitors: List[str]
     competitive_advantages: List[str]
     competitive_risks: List[str]
-    
-    # News and sentiment
-    recent_news: List[Dict]
+    recent_news: List[Dict[str, str]]
     sentiment_score: float
     key_events: List[str]
-    
-    # Leadership and culture
     leadership_info: Dict[str, Any]
     company_culture: str
     employee_sentiment: float
-    
-    # Technology and innovation
     tech_stack: List[str]
     patents: List[str]
     rd_investments: float
-    
-    # ESG and risks
     esg_score: Dict[str, float]
     risk_factors: List[str]
     regulatory_issues: List[str]
-    
-    # Final outputs
-    investment_recommendation: str
-    executive_summary: str
-    detailed_report: str
-    confidence_score: float
-    
-    # Workflow management
-    messages: Annotated[List, operator.add]
-    errors: List[str]
-    data_sources: List[str]
-    research_depth: Literal["quick", "standard", "deep"]
 
 # Define specialized agent nodes
+# Each node is a coroutine returning only the keys it owns, so the parallel
+# branches overlap their I/O and merge without clobbering each other
 
-def company_identifier(state: CompanyResearchState) -> CompanyResearchState:
+async def company_identifier(state: CompanyResearchState) -> Dict[str, Any]:
     """Identifies and validates the company, gets basic info"""
-    print(f"🏢 Company Identifier: Researching {state['company_name']}...")
+    print(f"🏢 Company Identifier: Researching {state.company_name}...")
     
     # Simulate company identification
     # In production, this would call APIs like Yahoo Finance, Bloomberg, etc.
     
     prompt = f"""
-    For the company "{state['company_name']}", provide:
+    For the company "{state.company_name}", provide:
     1. Official company name
     2. Stock ticker symbol (if public)
     3. Industry classification
@@ -86,21 +137,21 @@ def company_identifier(state: CompanyResearchState) -> CompanyResearchState:
     Format as JSON.
     """
     
-    # Simulate response
-    state['ticker'] = state.get('ticker', 'PRIVATE')
-    state['data_sources'].append('Company Database')
-    state['messages'].append(AIMessage(content=f"Identified company: {state['company_name']}"))
-    
-    return state
+    # Simulate response (in production: response = await llm.ainvoke(prompt))
+    return {
+        'ticker': state.ticker or 'PRIVATE',
+        'data_sources': ['Company Database'],
+        'messages': [AIMessage(content=f"Identified company: {state.company_name}")]
+    }
 
-def financial_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def financial_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes financial metrics and performance"""
     print("💰 Financial Analyst: Analyzing financial data...")
     
     # Simulate financial analysis
     # In production, integrate with financial APIs (Alpha Vantage, IEX Cloud, etc.)
     
-    state['financial_metrics'] = {
+    financial_metrics = {
         'revenue': 1000000000,
         'revenue_growth': 0.15,
         'profit_margin': 0.20,
@@ -109,19 +160,23 @@ def financial_analyst(state: CompanyResearchState) -> CompanyResearchState:
         'pe_ratio': 25.5
     }
     
-    state['revenue_trends'] = [
+    revenue_trends = [
         {'year': 2021, 'revenue': 800000000},
         {'year': 2022, 'revenue': 900000000},
         {'year': 2023, 'revenue': 1000000000}
     ]
     
-    state['profitability_analysis'] = "Strong profit margins with consistent growth"
-    state['data_sources'].append('Financial APIs')
-    state['messages'].append(AIMessage(content="Financial analysis completed"))
-    
-    return state
+    return {
+        'financial': FinancialState(
+            metrics=financial_metrics,
+            revenue_trends=revenue_trends,
+            profitability_analysis="Strong profit margins with consistent growth"
+        ),
+        'data_sources': ['Financial APIs'],
+        'messages': [AIMessage(content="Financial analysis completed")]
+    }
 
-def market_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def market_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes market position and competition"""
     print("📊 Market Analyst: Evaluating market position...")
     
@@ -129,202 +184,300 @@ def market_analyst(state: CompanyResearchState) -> CompanyResearchState:
     # In production, use industry databases, web scraping, etc.
     
     prompt = f"""
-    Analyze the competitive landscape for {state['company_name']}:
+    Analyze the competitive landscape for {state.company_name}:
     1. Main competitors
     2. Market share estimate
     3. Competitive advantages
     4. Competitive threats
     """
     
-    state['competitors'] = ['Competitor A', 'Competitor B', 'Competitor C']
-    state['market_share'] = 0.25
-    state['competitive_advantages'] = [
-        'Strong brand recognition',
-        'Superior technology platform',
-        'Extensive distribution network'
-    ]
-    state['competitive_risks'] = [
-        'New market entrants',
-        'Price competition',
-        'Technology disruption'
-    ]
-    
-    state['data_sources'].append('Industry Reports')
-    state['messages'].append(AIMessage(content="Market analysis completed"))
-    
-    return state
+    return {
+        'market': MarketState(
+            share=0.25,
+            competitors=['Competitor A', 'Competitor B', 'Competitor C'],
+            advantages=[
+                'Strong brand recognition',
+                'Superior technology platform',
+                'Extensive distribution network'
+            ],
+            risks=[
+                'New market entrants',
+                'Price competition',
+                'Technology disruption'
+            ]
+        ),
+        'data_sources': ['Industry Reports'],
+        'messages': [AIMessage(content="Market analysis completed")]
+    }
 
-def news_sentiment_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def news_sentiment_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes recent news and market sentiment"""
     print("📰 News Analyst: Tracking news and sentiment...")
     
     # Simulate news analysis
     # In production, use news APIs (NewsAPI, Benzinga, etc.)
     
-    state['recent_news'] = [
+    recent_news = [
         {
             'date': '2024-01-15',
-            'headline': f'{state["company_name"]} Announces Record Q4 Earnings',
+            'headline': f'{state.company_name} Announces Record Q4 Earnings',
             'sentiment': 'positive',
             'impact': 'high'
         },
         {
             'date': '2024-01-10',
-            'headline': f'{state["company_name"]} Launches New AI Product Line',
+            'headline': f'{state.company_name} Launches New AI Product Line',
             'sentiment': 'positive',
             'impact': 'medium'
         }
     ]
     
-    state['sentiment_score'] = 0.75  # 0-1 scale
-    state['key_events'] = [
+    key_events = [
         'Q4 earnings beat expectations',
         'New product launch successful',
         'Strategic partnership announced'
     ]
     
-    state['data_sources'].append('News APIs')
-    state['messages'].append(AIMessage(content="News sentiment analysis completed"))
-    
-    return state
+    return {
+        'news': NewsState(
+            recent_news=recent_news,
+            sentiment_score=0.75,  # 0-1 scale
+            key_events=key_events
+        ),
+        'data_sources': ['News APIs'],
+        'messages': [AIMessage(content="News sentiment analysis completed")]
+    }
 
-def leadership_culture_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def leadership_culture_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes leadership team and company culture"""
     print("👥 Leadership Analyst: Evaluating management and culture...")
     
     # Simulate leadership analysis
     # In production, use LinkedIn API, Glassdoor, etc.
     
-    state['leadership_info'] = {
+    leadership_info = {
         'ceo_tenure': 5,
         'management_stability': 'high',
         'board_independence': 0.8,
         'insider_ownership': 0.15
     }
     
-    state['company_culture'] = 'Innovation-focused with strong employee engagement'
-    state['employee_sentiment'] = 0.82  # Based on review sites
-    
-    state['data_sources'].append('Professional Networks')
-    state['messages'].append(AIMessage(content="Leadership analysis completed"))
-    
-    return state
+    return {
+        'leadership': LeadershipState(
+            info=leadership_info,
+            culture='Innovation-focused with strong employee engagement',
+            employee_sentiment=0.82  # Based on review sites
+        ),
+        'data_sources': ['Professional Networks'],
+        'messages': [AIMessage(content="Leadership analysis completed")]
+    }
 
-def technology_innovation_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def technology_innovation_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes technology stack and innovation capacity"""
     print("🔬 Tech Analyst: Assessing technology and innovation...")
     
     # Simulate tech analysis
     # In production, analyze job postings, patents, tech blogs
     
-    state['tech_stack'] = ['Cloud-native', 'AI/ML', 'Microservices', 'DevOps']
-    state['patents'] = ['AI-based recommendation system', 'Distributed computing method']
-    state['rd_investments'] = 0.15  # As percentage of revenue
-    
-    state['data_sources'].append('Patent Databases')
-    state['messages'].append(AIMessage(content="Technology analysis completed"))
-    
-    return state
+    return {
+        'technology': TechnologyState(
+            tech_stack=['Cloud-native', 'AI/ML', 'Microservices', 'DevOps'],
+            patents=['AI-based recommendation system', 'Distributed computing method'],
+            rd_investments=0.15  # As percentage of revenue
+        ),
+        'data_sources': ['Patent Databases'],
+        'messages': [AIMessage(content="Technology analysis completed")]
+    }
 
-def esg_risk_analyst(state: CompanyResearchState) -> CompanyResearchState:
+async def esg_risk_analyst(state: CompanyResearchState) -> Dict[str, Any]:
     """Analyzes ESG factors and risk profile"""
     print("🌍 ESG Analyst: Evaluating sustainability and risks...")
     
     # Simulate ESG analysis
     # In production, use ESG data providers (MSCI, Sustainalytics)
     
-    state['esg_score'] = {
+    esg_score = {
         'environmental': 0.75,
         'social': 0.80,
         'governance': 0.85
     }
     
-    state['risk_factors'] = [
+    risk_factors = [
         'Regulatory changes in key markets',
         'Supply chain dependencies',
         'Cybersecurity threats'
     ]
     
-    state['regulatory_issues'] = ['Data privacy compliance', 'Environmental regulations']
+    return {
+        'esg': ESGState(
+            scores=esg_score,
+            composite=sum(esg_score.values()) / 3.0,
+            risk_factors=risk_factors,
+            regulatory_issues=['Data privacy compliance', 'Environmental regulations']
+        ),
+        'data_sources': ['ESG Databases'],
+        'messages': [AIMessage(content="ESG analysis completed")]
+    }
+
+async def comprehensive_analyst(state: CompanyResearchState) -> Dict[str, Any]:
+    """Covers every analyst's section in one structured LLM call"""
+    print("🧠 Comprehensive Analyst: Running all analyses in a single pass...")
     
-    state['data_sources'].append('ESG Databases')
-    state['messages'].append(AIMessage(content="ESG analysis completed"))
+    # One round-trip instead of six; the sections mirror the specialist analysts
+    prompt = f"""
+    Research the company "{state.company_name}" for: {state.research_objective}.
+    Provide every section below:
+    1. Financials: key metrics (revenue, revenue_growth, profit_margin, debt_to_equity,
+       current_ratio, pe_ratio) and a one-line profitability analysis
+    2. Market: market share (0-1), main competitors, competitive advantages and risks
+    3. News: recent headlines with date, sentiment and impact, an overall sentiment
+       score (0-1) and key events
+    4. Leadership: CEO tenure, management stability, board independence, insider
+       ownership, company culture and employee sentiment (0-1)
+    5. Technology: tech stack, notable patents and R&D spend as a share of revenue
+    6. ESG: environmental, social and governance scores (0-1), risk factors and
+       regulatory issues
+    """
     
-    return state
+    research = await get_llm().with_structured_output(
+        CompanyResearchSchema, method="function_calling"
+    ).ainvoke(prompt)
+    
+    return {
+        'financial': FinancialState(
+            metrics=research.financial_metrics,
+            profitability_analysis=research.profitability_analysis
+        ),
+        'market': MarketState(
+            share=research.market_share,
+            competitors=research.competitors,
+            advantages=research.competitive_advantages,
+            risks=research.competitive_risks
+        ),
+        'news': NewsState(
+            recent_news=research.recent_news,
+            sentiment_score=research.sentiment_score,
+            key_events=research.key_events
+        ),
+        'leadership': LeadershipState(
+            info=research.leadership_info,
+            culture=research.company_culture,
+            employee_sentiment=research.employee_sentiment
+        ),
+        'technology': TechnologyState(
+            tech_stack=research.tech_stack,
+            patents=research.patents,
+            rd_investments=research.rd_investments
+        ),
+        'esg': ESGState(
+            scores=research.esg_score,
+            composite=sum(research.esg_score.values()) / 3.0,
+            risk_factors=research.risk_factors,
+            regulatory_issues=research.regulatory_issues
+        ),
+        'data_sources': ['LLM Research'],
+        'messages': [AIMessage(content="Comprehensive analysis completed")]
+    }
+
+# Investment score weights for sentiment, revenue growth above 10%, ESG
+# composite and employee sentiment
+SCORE_WEIGHTS = (0.3, 0.3, 0.2, 0.2)
+
+# Recommendation for scores strictly above each threshold, strongest first
+RECOMMENDATION_THRESHOLDS = ((0.7, "STRONG BUY"), (0.6, "BUY"), (0.4, "HOLD"))
+
+def score_companies(states: List[CompanyResearchState | Dict[str, Any]]) -> List[float]:
+    """Scores a batch of research states against SCORE_WEIGHTS in one pass"""
+    # Accepts graph output too: ainvoke and abatch return the state's fields
+    # as a dict, which is rebuilt into the state so both shapes score alike
+    states = [CompanyResearchState(**s) if isinstance(s, dict) else s for s in states]
+    features = [
+        (
+            s.news.sentiment_score,
+            s.financial.metrics.get('revenue_growth', 0) > 0.1,
+            s.esg.composite,
+            s.leadership.employee_sentiment
+        )
+        for s in states
+    ]
+    return [sum(map(operator.mul, SCORE_WEIGHTS, row)) for row in features]
 
-def report_synthesizer(state: CompanyResearchState) -> CompanyResearchState:
+def recommend(score: float) -> str:
+    """Maps an investment score to its recommendation label"""
+    for threshold, label in RECOMMENDATION_THRESHOLDS:
+        if score > threshold:
+            return label
+    return "SELL"
+
+async def report_synthesizer(state: CompanyResearchState) -> Dict[str, Any]:
     """Synthesizes all research into comprehensive report"""
     print("📝 Report Synthesizer: Creating comprehensive analysis...")
     
+    financial, market, news = state.financial, state.market, state.news
+    leadership, esg = state.leadership, state.esg
+    
     # Calculate confidence score based on data completeness
     data_points = [
-        state.get('financial_metrics'),
-        state.get('competitors'),
-        state.get('recent_news'),
-        state.get('leadership_info'),
-        state.get('esg_score')
+        financial.metrics,
+        market.competitors,
+        news.recent_news,
+        leadership.info,
+        esg.scores
     ]
-    state['confidence_score'] = sum(1 for dp in data_points if dp) / len(data_points)
+    confidence_score = sum(1 for dp in data_points if dp) / len(data_points)
     
     # Generate executive summary
-    state['executive_summary'] = f"""
-    EXECUTIVE SUMMARY - {state['company_name']}
-    
-    Financial Performance: {state.get('profitability_analysis', 'Analysis pending')}
-    Market Position: {state.get('market_share', 0)*100:.1f}% market share
-    Sentiment Score: {state.get('sentiment_score', 0)*100:.0f}% positive
-    ESG Rating: {sum(state.get('esg_score', {}).values())/3*100:.0f}/100
-    
-    Key Strengths:
-    {chr(10).join(f'• {adv}' for adv in state.get('competitive_advantages', [])[:3])}
-    
-    Key Risks:
-    {chr(10).join(f'• {risk}' for risk in state.get('risk_factors', [])[:3])}
-    
-    Research Confidence: {state['confidence_score']*100:.0f}%
-    """
+    buf = io.StringIO()
+    buf.write(f"EXECUTIVE SUMMARY - {state.company_name}\n\n")
+    buf.write(f"Financial Performance: {financial.profitability_analysis or 'Analysis pending'}\n")
+    buf.write(f"Market Position: {market.share*100:.1f}% market share\n")
+    buf.write(f"Sentiment Score: {news.sentiment_score*100:.0f}% positive\n")
+    buf.write(f"ESG Rating: {esg.composite*100:.0f}/100\n")
+    buf.write("\nKey Strengths:\n")
+    for adv in market.advantages[:3]:
+        buf.write(f"• {adv}\n")
+    buf.write("\nKey Risks:\n")
+    for risk in esg.risk_factors[:3]:
+        buf.write(f"• {risk}\n")
+    buf.write(f"\nResearch Confidence: {confidence_score*100:.0f}%\n")
+    executive_summary = buf.getvalue()
     
     # Generate investment recommendation
-    score = (
-        state.get('sentiment_score', 0.5) * 0.3 +
-        (state.get('financial_metrics', {}).get('revenue_growth', 0) > 0.1) * 0.3 +
-        (sum(state.get('esg_score', {}).values()) / 3) * 0.2 +
-        (state.get('employee_sentiment', 0.5)) * 0.2
-    )
-    
-    if score > 0.7:
-        state['investment_recommendation'] = "STRONG BUY"
-    elif score > 0.6:
-        state['investment_recommendation'] = "BUY"
-    elif score > 0.4:
-        state['investment_recommendation'] = "HOLD"
-    else:
-        state['investment_recommendation'] = "SELL"
-    
-    state['messages'].append(AIMessage(content="Research synthesis completed"))
+    investment_recommendation = recommend(score_companies([state])[0])
     
-    return state
+    return {
+        'confidence_score': confidence_score,
+        'executive_summary': executive_summary,
+        'investment_recommendation': investment_recommendation,
+        'messages': [AIMessage(content="Research synthesis completed")]
+    }
 
-def quality_validator(state: CompanyResearchState) -> CompanyResearchState:
+async def quality_validator(state: CompanyResearchState) -> Dict[str, Any]:
     """Validates research quality and completeness"""
     print("✅ Quality Validator: Checking research completeness...")
     
     # Check for missing critical data
-    critical_fields = ['financial_metrics', 'competitors', 'risk_factors']
-    missing = [field for field in critical_fields if not state.get(field)]
+    critical_fields = {
+        'financial_metrics': state.financial.metrics,
+        'competitors': state.market.competitors,
+        'risk_factors': state.esg.risk_factors
+    }
+    missing = [name for name, value in critical_fields.items() if not value]
     
+    errors = state.errors
     if missing:
-        state['errors'].append(f"Missing critical data: {', '.join(missing)}")
+        errors = errors + [f"Missing critical data: {', '.join(missing)}"]
     
     # Validate data freshness (in production, check timestamps)
-    state['messages'].append(AIMessage(content=f"Quality validation completed. Confidence: {state['confidence_score']*100:.0f}%"))
-    
-    return state
+    return {
+        'errors': errors,
+        'messages': [AIMessage(content=f"Quality validation completed. Confidence: {state.confidence_score*100:.0f}%")]
+    }
 
 # Define routing logic
 def determine_research_depth(state: CompanyResearchState) -> str:
     """Routes to different analysis paths based on research depth"""
-    depth = state.get('research_depth', 'standard')
+    depth = state.research_depth
     
     if depth == 'quick':
         return 'quick_analysis'
@@ -333,11 +486,38 @@ def determine_research_depth(state: CompanyResearchState) -> str:
     else:
         return 'standard_analysis'
 
-def should_enhance_research(state: CompanyResearchState) -> Literal["enhance", "complete"]:
+def dispatch_analysts(state: CompanyResearchState) -> List[Send] | str:
+    """Fans out to every analyst on the same superstep"""
+    # Quick research collapses the six analyst calls into one
+    if determine_research_depth(state) == 'quick_analysis':
+        return "comprehensive_analyst"
+    analyst_input = CompanyResearchState(
+        company_name=state.company_name,
+        research_objective=state.research_objective,
+        research_depth=state.research_depth
+    )
+    return [Send(analyst, analyst_input) for analyst in ANALYST_NODES]
+
+def should_enhance_research(state: CompanyResearchState) -> List[Send] | str:
     """Determines if additional research is needed"""
-    if state['confidence_score'] < 0.7 and len(state['errors']) == 0:
-        return "enhance"
-    return "complete"
+    # Quick research is one cached, deterministic LLM call, so running it
+    # again would return the same answer; it finishes with what it found
+    if determine_research_depth(state) == 'quick_analysis':
+        return END
+    if state.confidence_score < 0.7 and len(state.errors) == 0:
+        # Loop back for more research
+        return dispatch_analysts(state)
+    return END
+
+# Analysts that run in parallel between identification and synthesis
+ANALYST_NODES = [
+    "financial_analyst",
+    "market_analyst",
+    "news_sentiment_analyst",
+    "leadership_culture_analyst",
+    "technology_innovation_analyst",
+    "esg_risk_analyst"
+]
 
 # Build the graph
 def create_company_research_graph():
@@ -351,26 +531,24 @@ def create_company_research_graph():
     builder.add_node("leadership_culture_analyst", leadership_culture_analyst)
     builder.add_node("technology_innovation_analyst", technology_innovation_analyst)
     builder.add_node("esg_risk_analyst", esg_risk_analyst)
+    builder.add_node("comprehensive_analyst", comprehensive_analyst)
     builder.add_node("report_synthesizer", report_synthesizer)
     builder.add_node("quality_validator", quality_validator)
     
     # Define the flow
     builder.add_edge(START, "company_identifier")
     
-    # Parallel analysis paths
-    builder.add_edge("company_identifier", "financial_analyst")
-    builder.add_edge("company_identifier", "market_analyst")
-    builder.add_edge("company_identifier", "news_sentiment_analyst")
-    
-    # Standard flow includes these
-    builder.add_edge("financial_analyst", "leadership_culture_analyst")
-    builder.add_edge("market_analyst", "technology_innovation_analyst")
-    builder.add_edge("news_sentiment_analyst", "esg_risk_analyst")
+    # Parallel analysis paths: the analysts share no data, so all six
+    # are dispatched at once instead of in chained pairs
+    builder.add_conditional_edges(
+        "company_identifier",
+        dispatch_analysts,
+        [*ANALYST_NODES, "comprehensive_analyst"]
+    )
     
-    # All paths converge at synthesis
-    builder.add_edge("leadership_culture_analyst", "report_synthesizer")
-    builder.add_edge("technology_innovation_analyst", "report_synthesizer")
-    builder.add_edge("esg_risk_analyst", "report_synthesizer")
+    # All paths converge at synthesis once every analyst has finished
+    builder.add_edge(ANALYST_NODES, "report_synthesizer")
+    builder.add_edge("comprehensive_analyst", "report_synthesizer")
     
     # Quality check
     builder.add_edge("report_synthesizer", "quality_validator")
@@ -379,27 +557,70 @@ def create_company_research_graph():
     builder.add_conditional_edges(
         "quality_validator",
         should_enhance_research,
-        {
-            "enhance": "market_analyst",  # Loop back for more research
-            "complete": END
-        }
+        [*ANALYST_NODES, END]
     )
     
     return builder.compile()
 
+# Compiled once at import; the graph holds no per-run state
+_GRAPH = create_company_research_graph()
+
+def get_graph():
+    """Returns the shared compiled research graph"""
+    return _GRAPH
+
+def build_initial_state(company_info: Dict[str, str]) -> Dict[str, Any]:
+    """Builds the starting state for one research run"""
+    # Analyst outputs are left unset and start from their dataclass defaults
+    return {
+        "company_name": company_info['name'],
+        "research_objective": company_info['objective'],
+        "research_depth": company_info['depth'],
+        "messages": [],
+        "errors": [],
+        "data_sources": []
+    }
+
+# Maximum companies researched at once by quick_screen
+SCREEN_CONCURRENCY = 10
+
+async def quick_screen(companies: List[str], objective: str = "Investment screening") -> List[Tuple[str, float, str]]:
+    """Quick-researches many companies and ranks them as (name, score, recommendation), best first"""
+    # Every run takes the quick path, one comprehensive_analyst call per
+    # company, and abatch overlaps the calls. A company whose run fails is
+    # reported and left out of the ranking.
+    results = await get_graph().abatch(
+        [
+            build_initial_state({"name": name, "objective": objective, "depth": "quick"})
+            for name in companies
+        ],
+        config={"max_concurrency": SCREEN_CONCURRENCY},
+        return_exceptions=True
+    )
+    
+    screened = []
+    for name, result in zip(companies, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Screening failed for {name}: {result}")
+        else:
+            screened.append((name, result))
+    
+    scores = score_companies([result for _, result in screened])
+    ranking = [(name, score, recommend(score)) for (name, _), score in zip(screened, scores)]
+    return sorted(ranking, key=operator.itemgetter(1), reverse=True)
+
 # Example usage and demonstration
-if __name__ == "__main__":
-    # Create the research graph
-    graph = create_company_research_graph()
-    
-    # Save visualization
-    try:
-        img = Image(graph.get_graph().draw_mermaid_png())
-        with open("company_research_graph.png", "wb") as f:
-            f.write(img.data)
-        print("📊 Graph visualization saved as company_research_graph.png")
-    except Exception as e:
-        print(f"Visualization error: {e}")
+async def main():
+    graph = get_graph()
+    
+    # Save visualization (renders through mermaid.ink, so opt-in only)
+    if os.getenv("RENDER_GRAPH") == "1":
+        try:
+            with open("company_research_graph.png", "wb") as f:
+                f.write(graph.get_graph().draw_mermaid_png())
+            print("📊 Graph visualization saved as company_research_graph.png")
+        except Exception as e:
+            print(f"Visualization error: {e}")
     
     # Print Mermaid diagram
     print("\n🎨 Mermaid Diagram:")
@@ -417,59 +638,41 @@ if __name__ == "__main__":
         {"name": "Local Startup XYZ", "objective": "Acquisition target", "depth": "quick"}
     ]
     
-    for company_info in test_companies[:1]:  # Run first example
+    # Run every company concurrently; abatch multiplexes the runs and
+    # keeps a failure in one from aborting the others
+    results = await graph.abatch(
+        [build_initial_state(company_info) for company_info in test_companies],
+        config={"max_concurrency": 10},
+        return_exceptions=True
+    )
+    
+    for company_info, result in zip(test_companies, results):
         print(f"\n🏢 Researching: {company_info['name']}")
         print(f"📋 Objective: {company_info['objective']}")
         print(f"🔍 Research Depth: {company_info['depth']}")
         print("-" * 50)
         
-        initial_state = {
-            "company_name": company_info['name'],
-            "ticker": "",
-            "research_objective": company_info['objective'],
-            "research_depth": company_info['depth'],
-            "financial_metrics": {},
-            "revenue_trends": [],
-            "profitability_analysis": "",
-            "market_share": 0.0,
-            "competitors": [],
-            "competitive_advantages": [],
-            "competitive_risks": [],
-            "recent_news": [],
-            "sentiment_score": 0.0,
-            "key_events": [],
-            "leadership_info": {},
-            "company_culture": "",
-            "employee_sentiment": 0.0,
-            "tech_stack": [],
-            "patents": [],
-            "rd_investments": 0.0,
-            "esg_score": {},
-            "risk_factors": [],
-            "regulatory_issues": [],
-            "investment_recommendation": "",
-            "executive_summary": "",
-            "detailed_report": "",
-            "confidence_score": 0.0,
-            "messages": [],
-            "errors": [],
-            "data_sources": []
-        }
+        if isinstance(result, Exception):
+            print(f"Error: {result}")
+            print("Note: This demo simulates data. In production, connect real data sources.")
+            continue
         
-        try:
-            # Run the research
-            result = graph.invoke(initial_state)
-            
-            # Display results
-            print(f"\n📊 RESEARCH RESULTS")
-            print("="*50)
-            print(result['executive_summary'])
-            print(f"\n💡 Investment Recommendation: {result['investment_recommendation']}")
-            print(f"\n📚 Data Sources Used: {', '.join(set(result['data_sources']))}")
-            print(f"\n🔄 Research Steps:")
-            for msg in result['messages']:
-                print(f"  • {msg.content}")
-                
-        except Exception as e:
-            print(f"Error: {e}")
-            print("Note: This demo simulates data. In production, connect real data sources.")
\ No newline at end of file
+        # Display results
+        print(f"\n📊 RESEARCH RESULTS")
+        print("="*50)
+        print(result['executive_summary'])
+        print(f"\n💡 Investment Recommendation: {result['investment_recommendation']}")
+        print(f"\n📚 Data Sources Used: {', '.join(set(result['data_sources']))}")
+        print(f"\n🔄 Research Steps:")
+        for msg in result['messages']:
+            print(f"  • {msg.content}")
+    
+    # Screen a watchlist at quick depth and rank it
+    print("\n" + "="*60)
+    print("📈 QUICK SCREEN")
+    print("="*60)
+    for name, score, recommendation in await quick_screen(["Microsoft", "Nvidia", "Intel"]):
+        print(f"  {name}: {score:.2f} ({recommendation})")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,17 +8,23 @@ Demonstrates:
 - Fallback mechanisms
 """
 
-from typing import TypedDict, Literal, List, Dict, Annotated
+from typing import TypedDict, Literal, List, Dict, Set, Tuple, Annotated
 from langgraph.graph import StateGraph, START, END
+from collections import OrderedDict
+from copy import deepcopy
 from datetime import datetime
+import os
+import asyncio
 import random
+import re
+import time
 import json
-from IPython.display import Image, display
 import operator
 
 # Define our state
 class SupportState(TypedDict):
     customer_message: str
+    message_lower: str
     intent: str
     sentiment: str
     category: str
@@ -29,42 +35,106 @@ class SupportState(TypedDict):
     final_response: str
     conversation_history: Annotated[List[str], operator.add]
     metadata: Dict
+    keyword_hits: Set[str]
+    intent_id: int
+    sentiment_id: int
+
+# Keyword tables, checked in order (first matching intent wins)
+INTENT_KEYWORDS = {
+    'refund_request': ('refund', 'money back', 'return'),
+    'technical_issue': ('broken', 'not working', 'error', 'bug'),
+    'how_to_question': ('how to', 'help', 'guide'),
+    'complaint': ('angry', 'frustrated', 'terrible'),
+}
+NEGATIVE_WORDS = frozenset(['angry', 'frustrated', 'terrible', 'awful', 'hate', 'worst'])
+POSITIVE_WORDS = frozenset(['great', 'excellent', 'love', 'wonderful', 'amazing', 'best'])
+
+# One alternation over every keyword; the lookahead reports overlapping hits
+# so a single scan gives the same answers as separate substring checks
+_ALL_KEYWORDS = {word for words in INTENT_KEYWORDS.values() for word in words}
+_ALL_KEYWORDS.update(NEGATIVE_WORDS, POSITIVE_WORDS)
+KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_ALL_KEYWORDS, key=len, reverse=True))) + "))"
+)
+
+# Small integer ids so the priority matrix is a flat list lookup
+INTENT_ID = {intent: i for i, intent in enumerate([*INTENT_KEYWORDS, 'general_inquiry'])}
+SENTIMENT_ID = {'negative': 0, 'neutral': 1, 'positive': 2}
+
+# Priority matrix, flattened to PRIORITY_LUT[intent_id * 3 + sentiment_id]
+PRIORITY_RULES = {
+    ('complaint', 'negative'): 'high',
+    ('refund_request', 'negative'): 'high',
+    ('technical_issue', 'negative'): 'high',
+    ('complaint', 'neutral'): 'medium',
+    ('refund_request', 'neutral'): 'medium',
+    ('technical_issue', 'neutral'): 'medium',
+}
+PRIORITY_LUT = [
+    PRIORITY_RULES.get((intent, sentiment), 'low')
+    for intent in INTENT_ID
+    for sentiment in SENTIMENT_ID
+]
+
+# Simulated knowledge base, pre-aligned with INTENT_ID so a search is one index
+KB_ARTICLES = {
+    'refund_request': (
+        "Refunds are processed within 5-7 business days",
+        "You can request a refund through your account dashboard",
+        "Refund policy: Items must be returned within 30 days"
+    ),
+    'technical_issue': (
+        "Try restarting the application",
+        "Clear your cache and cookies",
+        "Check if you're using the latest version"
+    ),
+    'how_to_question': (
+        "Visit our help center at help.example.com",
+        "Check our video tutorials on YouTube",
+        "Download our user guide PDF"
+    )
+}
+KB_DEFAULT = ("Please contact our support team",)
+KB_RESPONSES = tuple(KB_ARTICLES.get(intent, KB_DEFAULT) for intent in INTENT_ID)
+
+def scan_keywords(message_lower: str) -> Set[str]:
+    """Finds every known keyword in the message in one pass"""
+    return {match.group(1) for match in KEYWORD_PATTERN.finditer(message_lower)}
 
 # Agent nodes
-def intent_classifier(state: SupportState) -> SupportState:
+async def normalize_message(state: SupportState) -> Dict:
+    """Lowercases the customer message once for every downstream check"""
+    return {'message_lower': state['customer_message'].lower()}
+
+async def intent_classifier(state: SupportState) -> Dict:
     """Classifies customer intent from their message"""
     print("🎯 Intent Classifier: Analyzing customer intent...")
     
     # Simulate intent classification
-    message_lower = state['customer_message'].lower()
-    
-    if any(word in message_lower for word in ['refund', 'money back', 'return']):
-        intent = 'refund_request'
-    elif any(word in message_lower for word in ['broken', 'not working', 'error', 'bug']):
-        intent = 'technical_issue'
-    elif any(word in message_lower for word in ['how to', 'help', 'guide']):
-        intent = 'how_to_question'
-    elif any(word in message_lower for word in ['angry', 'frustrated', 'terrible']):
-        intent = 'complaint'
-    else:
-        intent = 'general_inquiry'
+    # Scanned once here and reused by the sentiment analyzer
+    hits = scan_keywords(state['message_lower'])
+    
+    intent = next(
+        (intent for intent, words in INTENT_KEYWORDS.items() if not hits.isdisjoint(words)),
+        'general_inquiry'
+    )
     
-    state['intent'] = intent
-    state['conversation_history'].append(f"Intent classified as: {intent}")
-    return state
+    return {
+        'keyword_hits': hits,
+        'intent': intent,
+        'intent_id': INTENT_ID[intent],
+        'conversation_history': [f"Intent classified as: {intent}"]
+    }
 
-def sentiment_analyzer(state: SupportState) -> SupportState:
+async def sentiment_analyzer(state: SupportState) -> Dict:
     """Analyzes customer sentiment"""
     print("😊 Sentiment Analyzer: Detecting customer mood...")
     
-    message_lower = state['customer_message'].lower()
+    hits = state['keyword_hits']
     
     # Simple sentiment analysis
-    negative_words = ['angry', 'frustrated', 'terrible', 'awful', 'hate', 'worst']
-    positive_words = ['great', 'excellent', 'love', 'wonderful', 'amazing', 'best']
-    
-    neg_count = sum(1 for word in negative_words if word in message_lower)
-    pos_count = sum(1 for word in positive_words if word in message_lower)
+    neg_count = len(hits & NEGATIVE_WORDS)
+    pos_count = len(hits & POSITIVE_WORDS)
     
     if neg_count > pos_count:
         sentiment = 'negative'
@@ -73,62 +143,36 @@ def sentiment_analyzer(state: SupportState) -> SupportState:
     else:
         sentiment = 'neutral'
     
-    state['sentiment'] = sentiment
-    state['conversation_history'].append(f"Sentiment detected: {sentiment}")
-    return state
+    return {
+        'sentiment': sentiment,
+        'sentiment_id': SENTIMENT_ID[sentiment],
+        'conversation_history': [f"Sentiment detected: {sentiment}"]
+    }
 
-def priority_assigner(state: SupportState) -> SupportState:
+async def priority_assigner(state: SupportState) -> Dict:
     """Assigns priority based on intent and sentiment"""
     print("🚨 Priority Assigner: Determining urgency...")
     
-    # Priority matrix
-    priority_rules = {
-        ('complaint', 'negative'): 'high',
-        ('refund_request', 'negative'): 'high',
-        ('technical_issue', 'negative'): 'high',
-        ('complaint', 'neutral'): 'medium',
-        ('refund_request', 'neutral'): 'medium',
-        ('technical_issue', 'neutral'): 'medium',
-    }
-    
-    priority = priority_rules.get(
-        (state['intent'], state['sentiment']), 
-        'low'
-    )
+    priority = PRIORITY_LUT[state['intent_id'] * 3 + state['sentiment_id']]
     
-    state['priority'] = priority
-    state['conversation_history'].append(f"Priority set to: {priority}")
-    return state
+    return {
+        'priority': priority,
+        'conversation_history': [f"Priority set to: {priority}"]
+    }
 
-def knowledge_base_searcher(state: SupportState) -> SupportState:
+async def knowledge_base_searcher(state: SupportState) -> Dict:
     """Searches internal knowledge base"""
     print("📚 Knowledge Base: Searching for solutions...")
     
     # Simulate KB search
-    kb_responses = {
-        'refund_request': [
-            "Refunds are processed within 5-7 business days",
-            "You can request a refund through your account dashboard",
-            "Refund policy: Items must be returned within 30 days"
-        ],
-        'technical_issue': [
-            "Try restarting the application",
-            "Clear your cache and cookies",
-            "Check if you're using the latest version"
-        ],
-        'how_to_question': [
-            "Visit our help center at help.example.com",
-            "Check our video tutorials on YouTube",
-            "Download our user guide PDF"
-        ]
-    }
+    results = KB_RESPONSES[state['intent_id']]
     
-    results = kb_responses.get(state['intent'], ["Please contact our support team"])
-    state['knowledge_base_results'] = results
-    state['conversation_history'].append(f"Found {len(results)} KB articles")
-    return state
+    return {
+        'knowledge_base_results': results,
+        'conversation_history': [f"Found {len(results)} KB articles"]
+    }
 
-def response_generator(state: SupportState) -> SupportState:
+async def response_generator(state: SupportState) -> Dict:
     """Generates personalized responses"""
     print("💬 Response Generator: Crafting responses...")
     
@@ -152,11 +196,12 @@ def response_generator(state: SupportState) -> SupportState:
     if state['priority'] == 'high':
         responses.append("I've escalated this to our specialist team who will contact you within 24 hours.")
     
-    state['suggested_responses'] = responses
-    state['conversation_history'].append(f"Generated {len(responses)} response options")
-    return state
+    return {
+        'suggested_responses': responses,
+        'conversation_history': [f"Generated {len(responses)} response options"]
+    }
 
-def escalation_checker(state: SupportState) -> SupportState:
+async def escalation_checker(state: SupportState) -> Dict:
     """Determines if human escalation is needed"""
     print("🎯 Escalation Checker: Evaluating complexity...")
     
@@ -167,16 +212,17 @@ def escalation_checker(state: SupportState) -> SupportState:
         escalate = True
     elif state['sentiment'] == 'negative' and state['intent'] == 'complaint':
         escalate = True
-    elif 'legal' in state['customer_message'].lower():
+    elif 'legal' in state['message_lower']:
         escalate = True
-    elif 'manager' in state['customer_message'].lower():
+    elif 'manager' in state['message_lower']:
         escalate = True
     
-    state['escalation_needed'] = escalate
-    state['conversation_history'].append(f"Escalation needed: {escalate}")
-    return state
+    return {
+        'escalation_needed': escalate,
+        'conversation_history': [f"Escalation needed: {escalate}"]
+    }
 
-def response_optimizer(state: SupportState) -> SupportState:
+async def response_optimizer(state: SupportState) -> Dict:
     """Optimizes and personalizes the final response"""
     print("✨ Response Optimizer: Personalizing message...")
     
@@ -200,11 +246,12 @@ def response_optimizer(state: SupportState) -> SupportState:
     # Add closing
     final_parts.append("\n\nIs there anything else I can help you with?")
     
-    state['final_response'] = "\n".join(final_parts)
-    state['conversation_history'].append("Response optimized and ready")
-    return state
+    return {
+        'final_response': "\n".join(final_parts),
+        'conversation_history': ["Response optimized and ready"]
+    }
 
-def quality_checker(state: SupportState) -> SupportState:
+async def quality_checker(state: SupportState) -> Dict:
     """Final quality check before sending"""
     print("✅ Quality Checker: Validating response...")
     
@@ -216,16 +263,19 @@ def quality_checker(state: SupportState) -> SupportState:
         'grammar_correct': True
     }
     
-    state['metadata']['quality_checks'] = checks
-    state['conversation_history'].append("Quality checks passed")
-    return state
+    return {
+        'metadata': {**state['metadata'], 'quality_checks': checks},
+        'conversation_history': ["Quality checks passed"]
+    }
 
 # Routing functions
-def route_by_priority(state: SupportState) -> Literal["high_priority", "normal_flow"]:
+def route_by_priority(state: SupportState) -> List[str]:
     """Routes based on priority"""
+    # The escalation rules and the KB search are independent, so high
+    # priority tickets run both in parallel
     if state['priority'] == 'high':
-        return "high_priority"
-    return "normal_flow"
+        return ["escalation_checker", "kb_searcher"]
+    return ["kb_searcher"]
 
 def route_by_escalation(state: SupportState) -> Literal["escalate", "respond"]:
     """Routes based on escalation need"""
@@ -238,6 +288,7 @@ def create_support_graph():
     builder = StateGraph(SupportState)
     
     # Add all nodes
+    builder.add_node("normalize_message", normalize_message)
     builder.add_node("intent_classifier", intent_classifier)
     builder.add_node("sentiment_analyzer", sentiment_analyzer)
     builder.add_node("priority_assigner", priority_assigner)
@@ -248,7 +299,8 @@ def create_support_graph():
     builder.add_node("quality_checker", quality_checker)
     
     # Initial flow
-    builder.add_edge(START, "intent_classifier")
+    builder.add_edge(START, "normalize_message")
+    builder.add_edge("normalize_message", "intent_classifier")
     builder.add_edge("intent_classifier", "sentiment_analyzer")
     builder.add_edge("sentiment_analyzer", "priority_assigner")
     
@@ -256,18 +308,16 @@ def create_support_graph():
     builder.add_conditional_edges(
         "priority_assigner",
         route_by_priority,
-        {
-            "high_priority": "escalation_checker",
-            "normal_flow": "kb_searcher"
-        }
+        ["escalation_checker", "kb_searcher"]
     )
     
     # Normal flow
     builder.add_edge("kb_searcher", "response_generator")
     builder.add_edge("response_generator", "response_optimizer")
     
-    # High priority flow
-    builder.add_edge("escalation_checker", "kb_searcher")
+    # High priority flow: runs in the same step as kb_searcher, so
+    # response_generator still fires once with both results
+    builder.add_edge("escalation_checker", "response_generator")
     
     # Final steps
     builder.add_edge("response_optimizer", "quality_checker")
@@ -275,19 +325,75 @@ def create_support_graph():
     
     return builder.compile()
 
+# Compiled once at import; the graph holds no per-run state
+_GRAPH = create_support_graph()
+
+def get_graph():
+    """Returns the shared compiled support graph"""
+    return _GRAPH
+
+# Maximum support conversations processed at once
+MAX_CONCURRENCY = 10
+
+def make_initial_state(message: str) -> SupportState:
+    """Builds the starting state for one customer message"""
+    return {
+        "customer_message": message,
+        "intent": "",
+        "sentiment": "",
+        "category": "",
+        "priority": "",
+        "knowledge_base_results": [],
+        "suggested_responses": [],
+        "escalation_needed": False,
+        "final_response": "",
+        "conversation_history": [],
+        "metadata": {}
+    }
+
+# Recent answers keyed by the lowercased message, the exact text the graph
+# classifies, so repeats that differ only in case skip the graph. Oldest
+# entries go first.
+RESPONSE_CACHE_TTL = 300.0  # seconds
+RESPONSE_CACHE_SIZE = 1024
+_response_cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+
+async def answer_message(message: str) -> Dict:
+    """Runs the support graph for a message, reusing a recent identical answer"""
+    key = message.lower()
+    now = time.monotonic()
+    
+    cached = _response_cache.get(key)
+    if cached is not None:
+        stored_at, result = cached
+        if now - stored_at < RESPONSE_CACHE_TTL:
+            _response_cache.move_to_end(key)
+            # Callers get their own copy of the nested lists and dicts
+            return {**deepcopy(result), 'customer_message': message}
+        del _response_cache[key]
+    
+    result = await get_graph().ainvoke(make_initial_state(message))
+    
+    # Escalations get their own case ID, so they are never shared
+    if not result['escalation_needed']:
+        _response_cache[key] = (now, deepcopy(result))
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    
+    return result
+
 # Test the system
-if __name__ == "__main__":
-    # Create the graph
-    graph = create_support_graph()
-    
-    # Save visualization
-    try:
-        img = Image(graph.get_graph().draw_mermaid_png())
-        with open("support_bot_graph.png", "wb") as f:
-            f.write(img.data)
-        print("📊 Graph saved as support_bot_graph.png")
-    except Exception as e:
-        print(f"Visualization error: {e}")
+async def main():
+    graph = get_graph()
+    
+    # Save visualization (renders through mermaid.ink, so opt-in only)
+    if os.getenv("RENDER_GRAPH") == "1":
+        try:
+            with open("support_bot_graph.png", "wb") as f:
+                f.write(graph.get_graph().draw_mermaid_png())
+            print("📊 Graph saved as support_bot_graph.png")
+        except Exception as e:
+            print(f"Visualization error: {e}")
     
     # Print Mermaid
     print("\n🎨 Mermaid Diagram:")
@@ -305,26 +411,20 @@ if __name__ == "__main__":
     print("🤖 CUSTOMER SUPPORT BOT DEMO")
     print("="*60)
     
-    for i, message in enumerate(test_messages, 1):
+    # The test cases are independent, so run them concurrently (capped by
+    # a semaphore) and print the results in order afterwards
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    async def run_case(message: str) -> Dict:
+        async with semaphore:
+            return await answer_message(message)
+    
+    results = await asyncio.gather(*(run_case(message) for message in test_messages))
+    
+    for i, (message, result) in enumerate(zip(test_messages, results), 1):
         print(f"\n📧 Test Case {i}: '{message}'")
         print("-" * 50)
         
-        initial_state = {
-            "customer_message": message,
-            "intent": "",
-            "sentiment": "",
-            "category": "",
-            "priority": "",
-            "knowledge_base_results": [],
-            "suggested_responses": [],
-            "escalation_needed": False,
-            "final_response": "",
-            "conversation_history": [],
-            "metadata": {}
-        }
-        
-        result = graph.invoke(initial_state)
-        
         print(f"Intent: {result['intent']}")
         print(f"Sentiment: {result['sentiment']}")
         print(f"Priority: {result['priority']}")
@@ -332,4 +432,7 @@ if __name__ == "__main__":
         print(f"\n📨 Final Response:\n{result['final_response']}")
         print("\n💭 Process Flow:")
         for step in result['conversation_history']:
-            print(f"  • {step}")
\ No newline at end of file
+            print(f"  • {step}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
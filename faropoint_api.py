@@ -3,21 +3,27 @@ FastAPI backend for Faropoint Tenant Research
 Integrates with the LangGraph tenant research system
 """
 
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
-import json
+from typing import Dict, List, Set, Any, Optional
+import orjson
 import asyncio
 import uuid
 from datetime import datetime
+from contextlib import asynccontextmanager
 from sse_starlette.sse import EventSourceResponse
 
-# Import our LangGraph tenant research system
-from faropoint_tenant_demo import create_tenant_research_graph, TenantResearchState
+# LangGraph instance, compiled once per worker at startup and shared by
+# every job that worker runs
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from faropoint_tenant_demo import create_tenant_research_graph
+    app.state.graph = create_tenant_research_graph()
+    yield
 
-app = FastAPI(title="Faropoint Tenant Research API")
+app = FastAPI(title="Faropoint Tenant Research API", lifespan=lifespan)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -38,147 +44,178 @@ class ResearchResponse(BaseModel):
     status: str
     message: str
 
-# In-memory job storage (use Redis in production)
+# In-memory job storage (use Redis in production). Finished jobs are
+# evicted after JOB_TTL so the map only holds recent work.
+JOB_TTL = 3600  # seconds
 research_jobs: Dict[str, Dict[str, Any]] = {}
 
-# LangGraph instance
-tenant_graph = create_tenant_research_graph()
+# Human-readable progress labels, in the order the graph runs its nodes
+STEP_NAMES = {
+    "identify": "Company Identification",
+    "online": "Online Presence Analysis",
+    "verify": "Business Verification",
+    "financial": "Financial Indicators",
+    "real_estate": "Real Estate History",
+    "risk": "Risk Assessment",
+    "score": "Tenant Scoring",
+    "report": "Report Generation"
+}
+NEXT_STEP = dict(zip(STEP_NAMES, list(STEP_NAMES)[1:]))
 
-async def run_tenant_research(job_id: str, company_name: str, location: str):
+# Research jobs in flight; holding the tasks keeps them from being collected
+running_jobs: Set[asyncio.Task] = set()
+
+# Live progress streams, one bounded queue per connected client
+SUBSCRIBER_QUEUE_SIZE = 100
+SLOW_CLIENT_TIMEOUT = 5.0  # seconds a full queue may hold up the job
+subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+def sse_event(event: str, payload: Any) -> Dict[str, str]:
+    """Formats one server-sent event"""
+    return {"event": event, "data": orjson.dumps(payload).decode()}
+
+async def deliver(job_id: str, queue: asyncio.Queue, message: Dict[str, str]):
+    """Queues a message for one subscriber, dropping it if it has stalled"""
+    try:
+        await asyncio.wait_for(queue.put(message), timeout=SLOW_CLIENT_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"Slow client on job {job_id}, dropping its progress stream")
+        queues = subscribers.get(job_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        # Discard the backlog so the stream sees the disconnect next
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+async def publish(job_id: str, event: str, payload: Any):
+    """Records one event on the job and sends it to every stream following it"""
+    # Encoded once here; late joiners replay the stored messages as they are
+    message = sse_event(event, payload)
+    research_jobs[job_id]["events"].append(message)
+    
+    queues = subscribers.get(job_id)
+    if queues:
+        await asyncio.gather(*(deliver(job_id, queue, message) for queue in list(queues)))
+
+async def run_tenant_research(graph, job_id: str, company_name: str, location: str):
     """Run the tenant research workflow"""
     
     # Update job status
+    started_at = datetime.now().isoformat()
     research_jobs[job_id] = {
         "status": "running",
         "progress": [],
         "result": None,
         "error": None,
-        "started_at": datetime.now().isoformat()
+        "started_at": started_at,
+        "events": []
     }
+    job = research_jobs[job_id]
     
-    # Initialize state
-    initial_state = {
-        "company_name": company_name,
-        "location": location,
-        "industry": "",
-        "website_url": None,
-        "social_media_profiles": {},
-        "online_reviews": [],
-        "review_sentiment": 0.5,
-        "business_registration": {},
-        "years_in_business": None,
-        "business_type": "",
-        "is_verified": False,
-        "estimated_revenue": None,
-        "employee_count": None,
-        "growth_indicators": [],
-        "current_locations": [],
-        "space_requirements": None,
-        "lease_history": [],
-        "litigation_history": [],
-        "bankruptcy_flags": False,
-        "negative_news": [],
-        "risk_score": 0.5,
-        "creditworthiness_indicators": [],
-        "stability_score": 0.0,
-        "growth_potential": 0.0,
-        "overall_tenant_score": 0.0,
-        "recommendation": "Not Recommended",
-        "executive_summary": "",
-        "key_concerns": [],
-        "positive_factors": [],
-        "messages": [],
-        "data_sources": [],
-        "confidence_level": 0.0
-    }
+    # The progress log is append-only: a step's completion is a new entry,
+    # never an edit to the entry that announced it
+    async def record_step(progress_update: Dict[str, Any]) -> Dict[str, Any]:
+        job["progress"].append(progress_update)
+        await publish(job_id, "progress", progress_update)
+        return progress_update
+    
+    async def start_step(step_id: str, timestamp: str) -> Dict[str, Any]:
+        return await record_step({
+            "stepId": step_id,
+            "stepName": STEP_NAMES[step_id],
+            "status": "active",
+            "timestamp": timestamp
+        })
     
     try:
-        # Simulate step-by-step execution with progress updates
-        steps = [
-            ("identify", "Company Identification"),
-            ("online", "Online Presence Analysis"),
-            ("verify", "Business Verification"),
-            ("financial", "Financial Indicators"),
-            ("real_estate", "Real Estate History"),
-            ("risk", "Risk Assessment"),
-            ("score", "Tenant Scoring"),
-            ("report", "Report Generation")
-        ]
+        from faropoint_tenant_demo import make_initial_state
         
-        for step_id, step_name in steps:
-            # Update progress
-            progress_update = {
-                "stepId": step_id,
-                "stepName": step_name,
-                "status": "active",
-                "timestamp": datetime.now().isoformat()
-            }
-            research_jobs[job_id]["progress"].append(progress_update)
-            
-            # Simulate processing time
-            await asyncio.sleep(2)
-            
-            # Mark step as completed
-            progress_update["status"] = "completed"
+        # Progress follows the real graph: each node's update completes its
+        # step and starts the next one
+        final_state = None
+        progress_update = await start_step("identify", started_at)
         
-        # Run the actual graph (in production)
-        # result = tenant_graph.invoke(initial_state)
+        async for mode, chunk in graph.astream(
+            make_initial_state(company_name, location),
+            stream_mode=["updates", "values"]
+        ):
+            if mode == "values":
+                final_state = chunk
+                continue
+            
+            # One clock read per graph step, shared by everything it touches
+            now = datetime.now().isoformat()
+            for step_id in chunk:
+                await record_step({**progress_update, "status": "completed", "timestamp": now})
+                if step_id in NEXT_STEP:
+                    progress_update = await start_step(NEXT_STEP[step_id], now)
         
-        # For demo, create a mock result
-        result = {
-            "companyName": company_name,
-            "location": location,
-            "industry": "Technology",
-            "recommendation": "Recommended",
-            "overallScore": 75.5,
-            "scores": {
-                "stability": 0.82,
-                "growth": 0.68,
-                "risk": 0.25,
-                "reputation": 0.85
-            },
-            "keyMetrics": {
-                "yearsInBusiness": 5,
-                "businessType": "LLC",
-                "verified": True,
-                "revenue": "$5-10M",
-                "employees": "50-100",
-                "currentLocations": 2
-            },
-            "strengths": [
-                "Strong online reputation",
-                "Verified business entity",
-                "Consistent growth trajectory",
-                "Multiple existing locations"
-            ],
-            "concerns": [
-                "Limited financial history",
-                "High employee turnover rate"
-            ],
-            "confidenceLevel": 0.85,
-            "dataSources": 6
-        }
+        result = build_result(final_state)
         
-        research_jobs[job_id]["status"] = "completed"
-        research_jobs[job_id]["result"] = result
-        research_jobs[job_id]["completed_at"] = datetime.now().isoformat()
+        job["status"] = "completed"
+        job["result"] = result
+        job["completed_at"] = datetime.now().isoformat()
+        await publish(job_id, "complete", result)
         
     except Exception as e:
-        research_jobs[job_id]["status"] = "failed"
-        research_jobs[job_id]["error"] = str(e)
+        job["status"] = "failed"
+        job["error"] = str(e)
+        await publish(job_id, "error", {"message": job["error"]})
+    
+    finally:
+        # Streams still open have already been sent their final event
+        asyncio.get_running_loop().call_later(JOB_TTL, research_jobs.pop, job_id, None)
+
+def build_result(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Shapes the final graph state into the frontend's result payload"""
+    return {
+        "companyName": state['company_name'],
+        "location": state['location'],
+        "industry": state['industry'],
+        "recommendation": state['recommendation'],
+        "overallScore": round(state['overall_tenant_score'], 1),
+        "scores": {
+            "stability": round(state['stability_score'], 2),
+            "growth": round(state['growth_potential'], 2),
+            "risk": round(state['risk_score'], 2),
+            "reputation": round(state['review_sentiment'], 2)
+        },
+        "keyMetrics": {
+            "yearsInBusiness": state['years_in_business'],
+            "businessType": state['business_type'],
+            "verified": state['is_verified'],
+            "revenue": state['estimated_revenue'],
+            "employees": state['employee_count'],
+            "currentLocations": len(state['current_locations'])
+        },
+        "strengths": state['positive_factors'],
+        "concerns": state['key_concerns'],
+        "confidenceLevel": round(state['confidence_level'], 2),
+        "dataSources": len(set(state['data_sources']))
+    }
 
 @app.post("/api/research", response_model=ResearchResponse)
-async def start_research(request: ResearchRequest, background_tasks: BackgroundTasks):
+async def start_research(request: ResearchRequest):
     """Start a new tenant research job"""
+    return start_job(request)
+
+@app.post("/api/research/batch", response_model=List[ResearchResponse])
+async def start_research_batch(requests: List[ResearchRequest]):
+    """Start one tenant research job per company; the jobs run concurrently"""
+    return [start_job(request) for request in requests]
+
+def start_job(request: ResearchRequest) -> ResearchResponse:
+    """Schedules a research job and returns its handle"""
     job_id = str(uuid.uuid4())
     
-    # Start background task
-    background_tasks.add_task(
-        run_tenant_research,
-        job_id,
-        request.companyName,
-        request.location
+    # Run the job as its own task rather than a response background task,
+    # so the request cycle completes as soon as the job is scheduled
+    task = asyncio.create_task(
+        run_tenant_research(app.state.graph, job_id, request.companyName, request.location)
     )
+    running_jobs.add(task)
+    task.add_done_callback(running_jobs.discard)
     
     return ResearchResponse(
         jobId=job_id,
@@ -192,55 +229,59 @@ async def get_research_status(job_id: str):
     if job_id not in research_jobs:
         return {"error": "Job not found"}
     
+    # Encoded straight to bytes; the payload is plain JSON types, so the
+    # generic jsonable_encoder walk over the result adds nothing
     job = research_jobs[job_id]
-    return {
-        "jobId": job_id,
-        "status": job["status"],
-        "progress": job["progress"],
-        "result": job["result"],
-        "error": job["error"]
-    }
+    return Response(
+        orjson.dumps({
+            "jobId": job_id,
+            "status": job["status"],
+            "progress": job["progress"],
+            "result": job["result"],
+            "error": job["error"]
+        }),
+        media_type="application/json"
+    )
 
 @app.get("/api/research/{job_id}/progress")
 async def research_progress_stream(job_id: str):
     """Server-sent events endpoint for real-time progress updates"""
     
     async def event_generator():
-        while True:
-            if job_id not in research_jobs:
-                yield {
-                    "event": "error",
-                    "data": json.dumps({"message": "Job not found"})
-                }
-                break
-            
-            job = research_jobs[job_id]
-            
-            # Send progress updates
-            if job["progress"]:
-                latest_progress = job["progress"][-1]
-                yield {
-                    "event": "progress",
-                    "data": json.dumps(latest_progress)
-                }
-            
-            # Check if completed
-            if job["status"] == "completed":
-                yield {
-                    "event": "complete",
-                    "data": json.dumps(job["result"])
-                }
-                break
-            
-            # Check if failed
-            if job["status"] == "failed":
-                yield {
-                    "event": "error",
-                    "data": json.dumps({"message": job["error"]})
-                }
-                break
+        if job_id not in research_jobs:
+            yield sse_event("error", {"message": "Job not found"})
+            return
+        
+        job = research_jobs[job_id]
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        
+        # Snapshot what already happened and subscribe in the same step, so
+        # no update can fall between the two
+        backlog = list(job["events"])
+        live = job["status"] not in ("completed", "failed")
+        if live:
+            subscribers.setdefault(job_id, []).append(queue)
+        
+        try:
+            for message in backlog:
+                yield message
+            if not live:
+                return
             
-            await asyncio.sleep(1)
+            while True:
+                message = await queue.get()
+                if message is None:
+                    yield sse_event("error", {"message": "Progress stream dropped: client too slow"})
+                    break
+                yield message
+                if message["event"] in ("complete", "error"):
+                    break
+        finally:
+            queues = subscribers.get(job_id)
+            if queues and queue in queues:
+                queues.remove(queue)
+            if queues == []:
+                del subscribers[job_id]
     
     return EventSourceResponse(event_generator())
 
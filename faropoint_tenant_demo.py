@@ -3,65 +3,112 @@ Faropoint Tenant Research System - Demo Version (No API Required)
 Simulates tenant research workflow for commercial real estate
 """
 
-from typing import TypedDict, Literal, List, Dict, Any, Annotated, Optional
+from typing import Literal, List, Dict, Any, Optional, Tuple, Annotated
 from langgraph.graph import StateGraph, START, END
 from datetime import datetime
+from dataclasses import dataclass, field
+import os
 import json
-import operator
 import random
 import re
+import bisect
+import operator
 
-# Define the state for tenant research
-class TenantResearchState(TypedDict):
+# Define the state for tenant research. Each agent returns only the fields
+# it sets; messages and data sources accumulate across agents.
+@dataclass(slots=True)
+class TenantResearchState:
     # Company Information
     company_name: str
-    location: str
-    industry: str
+    location: str = ""
+    industry: str = ""
+    company_data: Dict[str, Any] = field(default_factory=dict)
     
     # Online Presence
-    website_url: Optional[str]
-    social_media_profiles: Dict[str, str]
-    online_reviews: List[Dict]
-    review_sentiment: float
+    website_url: Optional[str] = None
+    social_media_profiles: Dict[str, str] = field(default_factory=dict)
+    online_reviews: List[Dict] = field(default_factory=list)
+    review_sentiment: float = 0.5
     
     # Business Verification
-    business_registration: Dict[str, Any]
-    years_in_business: Optional[int]
-    business_type: str
-    is_verified: bool
+    business_registration: Dict[str, Any] = field(default_factory=dict)
+    years_in_business: Optional[int] = None
+    business_type: str = ""
+    is_verified: bool = False
     
     # Financial Indicators
-    estimated_revenue: Optional[str]
-    employee_count: Optional[str]
-    growth_indicators: List[str]
+    estimated_revenue: Optional[str] = None
+    employee_count: Optional[str] = None
+    revenue_usd: Optional[float] = None  # lower bound of the revenue band
+    employee_count_min: Optional[int] = None
+    employee_count_max: Optional[int] = None
+    growth_indicators: List[str] = field(default_factory=list)
     
     # Real Estate Relevant
-    current_locations: List[str]
-    space_requirements: Optional[str]
-    lease_history: List[Dict]
+    current_locations: List[str] = field(default_factory=list)
+    space_requirements: Optional[str] = None
+    lease_history: List[Dict] = field(default_factory=list)
     
     # Risk Assessment
-    litigation_history: List[str]
-    bankruptcy_flags: bool
-    negative_news: List[str]
-    risk_score: float
+    litigation_history: List[str] = field(default_factory=list)
+    bankruptcy_flags: bool = False
+    negative_news: List[str] = field(default_factory=list)
+    risk_score: float = 0.5
     
     # Tenant Quality Score
-    creditworthiness_indicators: List[str]
-    stability_score: float
-    growth_potential: float
-    overall_tenant_score: float
+    creditworthiness_indicators: List[str] = field(default_factory=list)
+    stability_score: float = 0.0
+    growth_potential: float = 0.0
+    overall_tenant_score: float = 0.0
     
     # Final Outputs
-    recommendation: Literal["Highly Recommended", "Recommended", "Proceed with Caution", "Not Recommended"]
-    executive_summary: str
-    key_concerns: List[str]
-    positive_factors: List[str]
+    recommendation: Literal["Highly Recommended", "Recommended", "Proceed with Caution", "Not Recommended"] = "Not Recommended"
+    executive_summary: str = ""
+    key_concerns: List[str] = field(default_factory=list)
+    positive_factors: List[str] = field(default_factory=list)
     
     # Workflow Management
-    messages: Annotated[List[str], operator.add]
-    data_sources: List[str]
-    confidence_level: float
+    messages: Annotated[List[str], operator.add] = field(default_factory=list)
+    data_sources: Annotated[List[str], operator.add] = field(default_factory=list)
+    confidence_level: float = 0.0
+
+# Evaluated once at import; fine for the lifetime of a demo process
+CURRENT_YEAR = datetime.now().year
+
+# Display bands such as "500-1000" employees or "$5-10M" revenue are parsed
+# once into numbers; the agents compare those instead of substrings
+RANGE_PATTERN = re.compile(r'(\d+)(?:-(\d+))?')
+REVENUE_PATTERN = re.compile(r'(Under )?\$(\d+)(?:-\d+)?([KMB])')
+REVENUE_UNITS = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+
+def parse_range(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """Parses a count band like '50-100' into (min, max)"""
+    match = RANGE_PATTERN.search(text or "")
+    if not match:
+        return None, None
+    low = int(match.group(1))
+    return low, int(match.group(2) or low)
+
+def parse_revenue(text: Optional[str]) -> Optional[float]:
+    """Parses a revenue band like '$5-10M', '$100M+' or 'Under $1M' into its lower bound in USD"""
+    match = REVENUE_PATTERN.search(text or "")
+    if not match:
+        return None
+    under, low, unit = match.groups()
+    return 0.0 if under else int(low) * REVENUE_UNITS[unit]
+
+# Entity suffixes in a company name; also matches "Inc." and "Corporation"
+BUSINESS_TYPE_PATTERN = re.compile(r'\b(LLC|Inc|Corp)', re.IGNORECASE)
+BUSINESS_TYPES = {'LLC': "LLC", 'INC': "Corporation", 'CORP': "Corporation"}
+
+# Lower score bound of each recommendation above "Not Recommended"
+RECOMMENDATION_THRESHOLDS = (40, 60, 75)
+RECOMMENDATIONS = ("Not Recommended", "Proceed with Caution", "Recommended", "Highly Recommended")
+
+def company_rng(company_name: str, purpose: str) -> random.Random:
+    """Private random source for simulated data, so a company always gets the same values"""
+    # String seeds are hashed with SHA-512, so they are stable across processes
+    return random.Random(f"{company_name}:{purpose}")
 
 # Simulated data for demo
 DEMO_COMPANY_DATA = {
@@ -100,309 +147,358 @@ DEMO_COMPANY_DATA = {
     }
 }
 
-def company_identifier_agent(state: TenantResearchState) -> TenantResearchState:
+def company_identifier_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates company identification"""
-    print(f"🔍 Identifying company: {state['company_name']}...")
+    print(f"🔍 Identifying company: {state.company_name}...")
     
-    # Simulate finding company data
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
+    # Simulate finding company data; looked up once and shared with
+    # every downstream agent through the state
+    company_data = DEMO_COMPANY_DATA.get(state.company_name, {})
+    update = {"company_data": company_data, "messages": [], "data_sources": ["Business Database Search"]}
     
     if company_data:
-        state['industry'] = company_data.get('industry', 'Unknown')
-        state['website_url'] = company_data.get('website')
-        state['messages'].append(f"✓ Found company profile for {state['company_name']}")
-        if state['website_url']:
-            state['messages'].append(f"✓ Website: {state['website_url']}")
+        update['industry'] = company_data.get('industry', 'Unknown')
+        website_url = update['website_url'] = company_data.get('website')
+        update['messages'].append(f"✓ Found company profile for {state.company_name}")
+        if website_url:
+            update['messages'].append(f"✓ Website: {website_url}")
     else:
         # Simulate unknown company
-        state['industry'] = "Unknown"
-        state['messages'].append(f"⚠️ Limited information available for {state['company_name']}")
+        update['industry'] = "Unknown"
+        update['messages'].append(f"⚠️ Limited information available for {state.company_name}")
     
-    state['data_sources'].append("Business Database Search")
-    return state
+    return update
 
-def online_presence_analyzer(state: TenantResearchState) -> TenantResearchState:
+def online_presence_analyzer(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates online presence analysis"""
     print("🌐 Analyzing online presence...")
     
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
+    company_data = state.company_data
+    rng = company_rng(state.company_name, "online")
+    messages = []
     
     # Social media profiles
-    state['social_media_profiles'] = company_data.get('social_media', {})
-    if state['social_media_profiles']:
-        state['messages'].append(f"✓ Found {len(state['social_media_profiles'])} social media profiles")
+    social_media_profiles = company_data.get('social_media', {})
+    if social_media_profiles:
+        messages.append(f"✓ Found {len(social_media_profiles)} social media profiles")
     
     # Review sentiment
-    review_score = company_data.get('review_score', random.uniform(3.0, 4.5))
-    state['review_sentiment'] = review_score / 5.0  # Normalize to 0-1
+    review_score = company_data.get('review_score')
+    if review_score is None:
+        review_score = rng.uniform(3.0, 4.5)
+    review_sentiment = review_score / 5.0  # Normalize to 0-1
     
     # Simulate reviews
-    state['online_reviews'] = [
+    online_reviews = [
         {
             "source": "Google",
             "rating": review_score,
-            "count": random.randint(10, 200),
+            "count": rng.randint(10, 200),
             "summary": "Generally positive" if review_score > 4 else "Mixed reviews"
         }
     ]
     
-    state['messages'].append(f"✓ Review sentiment: {state['review_sentiment']:.2f} ({review_score:.1f}/5.0)")
-    state['data_sources'].append("Online Review Platforms")
+    messages.append(f"✓ Review sentiment: {review_sentiment:.2f} ({review_score:.1f}/5.0)")
     
-    return state
+    return {
+        "social_media_profiles": social_media_profiles,
+        "review_sentiment": review_sentiment,
+        "online_reviews": online_reviews,
+        "messages": messages,
+        "data_sources": ["Online Review Platforms"]
+    }
 
-def business_verification_agent(state: TenantResearchState) -> TenantResearchState:
+def business_verification_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates business verification"""
     print("📋 Verifying business registration...")
     
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
+    company_data = state.company_data
     
-    # Determine business type
-    if "LLC" in state['company_name']:
-        state['business_type'] = "LLC"
-    elif "Inc" in state['company_name'] or "Corp" in state['company_name']:
-        state['business_type'] = "Corporation"
-    else:
-        state['business_type'] = "LLC"  # Default assumption
+    # Determine business type from the first entity suffix in the name
+    match = BUSINESS_TYPE_PATTERN.search(state.company_name)
+    business_type = BUSINESS_TYPES[match.group(1).upper()] if match else "LLC"  # Default assumption
     
     # Years in business
     if 'founded' in company_data:
-        state['years_in_business'] = datetime.now().year - company_data['founded']
-        state['is_verified'] = True
-        state['messages'].append(f"✓ Verified: {state['years_in_business']} years in business")
+        years_in_business = CURRENT_YEAR - company_data['founded']
+        is_verified = True
+        message = f"✓ Verified: {years_in_business} years in business"
     else:
-        state['years_in_business'] = random.randint(1, 5)
-        state['is_verified'] = random.choice([True, False])
-        if state['is_verified']:
-            state['messages'].append("✓ Business registration verified")
+        rng = company_rng(state.company_name, "verify")
+        years_in_business = rng.randint(1, 5)
+        is_verified = rng.choice([True, False])
+        if is_verified:
+            message = "✓ Business registration verified"
         else:
-            state['messages'].append("⚠️ Could not verify business registration")
-    
-    state['data_sources'].append("State Business Registry")
-    return state
+            message = "⚠️ Could not verify business registration"
+    
+    return {
+        "business_type": business_type,
+        "years_in_business": years_in_business,
+        "is_verified": is_verified,
+        "messages": [message],
+        "data_sources": ["State Business Registry"]
+    }
 
-def financial_indicators_agent(state: TenantResearchState) -> TenantResearchState:
+def financial_indicators_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates financial analysis"""
     print("💰 Analyzing financial indicators...")
     
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
+    company_data = state.company_data
     
     # Revenue and employees
-    state['estimated_revenue'] = company_data.get('revenue', "Not disclosed")
-    state['employee_count'] = company_data.get('employees', "Unknown")
+    estimated_revenue = company_data.get('revenue', "Not disclosed")
+    employee_count = company_data.get('employees', "Unknown")
+    revenue_usd = parse_revenue(company_data.get('revenue'))
+    employee_count_min, employee_count_max = parse_range(company_data.get('employees'))
     
     # Growth indicators
-    if state['years_in_business'] and state['years_in_business'] < 5:
-        state['growth_indicators'] = ["Young growing company", "Expanding team"]
-    elif state['estimated_revenue'] and "100M" in state['estimated_revenue']:
-        state['growth_indicators'] = ["Strong revenue", "Market leader", "Stable growth"]
+    if state.years_in_business and state.years_in_business < 5:
+        growth_indicators = ["Young growing company", "Expanding team"]
+    elif revenue_usd is not None and revenue_usd >= 100e6:
+        growth_indicators = ["Strong revenue", "Market leader", "Stable growth"]
     else:
-        state['growth_indicators'] = ["Steady operations"]
-    
-    state['messages'].append(f"✓ Revenue estimate: {state['estimated_revenue']}")
-    state['messages'].append(f"✓ Employee count: {state['employee_count']}")
-    state['data_sources'].append("Financial Indicators Analysis")
-    
-    return state
+        growth_indicators = ["Steady operations"]
+    
+    return {
+        "estimated_revenue": estimated_revenue,
+        "employee_count": employee_count,
+        "revenue_usd": revenue_usd,
+        "employee_count_min": employee_count_min,
+        "employee_count_max": employee_count_max,
+        "growth_indicators": growth_indicators,
+        "messages": [
+            f"✓ Revenue estimate: {estimated_revenue}",
+            f"✓ Employee count: {employee_count}"
+        ],
+        "data_sources": ["Financial Indicators Analysis"]
+    }
 
-def real_estate_history_agent(state: TenantResearchState) -> TenantResearchState:
+def real_estate_history_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates real estate history research"""
     print("🏢 Researching real estate history...")
     
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
+    company_data = state.company_data
+    update = {"messages": [], "data_sources": ["Commercial Real Estate Records"]}
     
     # Current locations
-    state['current_locations'] = company_data.get('locations', [])
-    if state['current_locations']:
-        state['messages'].append(f"✓ Found {len(state['current_locations'])} current location(s)")
+    current_locations = update['current_locations'] = company_data.get('locations', [])
+    if current_locations:
+        update['messages'].append(f"✓ Found {len(current_locations)} current location(s)")
     else:
-        state['messages'].append("⚠️ No verified locations found")
+        update['messages'].append("⚠️ No verified locations found")
     
     # Space requirements (simulate based on employee count)
-    if state['employee_count'] and state['employee_count'] != "Unknown":
-        if "500" in state['employee_count']:
-            state['space_requirements'] = "20,000-50,000 sq ft"
-        elif "50" in state['employee_count']:
-            state['space_requirements'] = "5,000-10,000 sq ft"
+    if state.employee_count_max is not None:
+        if state.employee_count_min >= 500:
+            space_requirements = "20,000-50,000 sq ft"
+        elif state.employee_count_max >= 50:
+            space_requirements = "5,000-10,000 sq ft"
         else:
-            state['space_requirements'] = "1,000-5,000 sq ft"
-        state['messages'].append(f"✓ Estimated space needs: {state['space_requirements']}")
+            space_requirements = "1,000-5,000 sq ft"
+        update['space_requirements'] = space_requirements
+        update['messages'].append(f"✓ Estimated space needs: {space_requirements}")
     
     # Lease history
-    if state['current_locations']:
-        state['lease_history'] = [{"type": "Current lease", "status": "Active"}]
+    if current_locations:
+        update['lease_history'] = [{"type": "Current lease", "status": "Active"}]
     
-    state['data_sources'].append("Commercial Real Estate Records")
-    return state
+    return update
 
-def risk_assessment_agent(state: TenantResearchState) -> TenantResearchState:
+def risk_assessment_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Simulates risk assessment"""
     print("⚠️ Performing risk assessment...")
     
-    company_data = DEMO_COMPANY_DATA.get(state['company_name'], {})
-    risk_factors = company_data.get('risk_factors', [])
-    
-    # Litigation (simulate)
-    state['litigation_history'] = []
-    state['bankruptcy_flags'] = False
+    risk_factors = state.company_data.get('risk_factors', [])
+    years = state.years_in_business
     
-    # Negative news
-    state['negative_news'] = risk_factors
+    # Negative news, copied so the demo data is never modified
+    negative_news = list(risk_factors)
     
     # Calculate risk score
     risk_points = 0
     
-    if state['years_in_business'] and state['years_in_business'] < 2:
+    if years and years < 2:
         risk_points += 3
-        state['negative_news'].append("Very new business")
+        negative_news.append("Very new business")
     
-    if not state['is_verified']:
+    if not state.is_verified:
         risk_points += 2
         
-    if not state['website_url']:
+    if not state.website_url:
         risk_points += 1
         
-    if len(state['current_locations']) == 0:
+    if len(state.current_locations) == 0:
         risk_points += 2
         
-    risk_points += len(risk_factors) * 0.5
-    
-    state['risk_score'] = min(risk_points / 10, 1.0)
-    state['messages'].append(f"✓ Risk assessment complete: {state['risk_score']:.2f}")
-    
-    if state['negative_news']:
-        state['messages'].append(f"⚠️ Risk factors: {', '.join(state['negative_news'][:2])}")
-    
-    state['data_sources'].append("Risk Assessment Database")
-    return state
+    risk_points += len(negative_news) * 0.5
+    
+    risk_score = min(risk_points / 10, 1.0)
+    messages = [f"✓ Risk assessment complete: {risk_score:.2f}"]
+    
+    if negative_news:
+        messages.append(f"⚠️ Risk factors: {', '.join(negative_news[:2])}")
+    
+    return {
+        # Litigation (simulate)
+        "litigation_history": [],
+        "bankruptcy_flags": False,
+        "negative_news": negative_news,
+        "risk_score": risk_score,
+        "messages": messages,
+        "data_sources": ["Risk Assessment Database"]
+    }
 
-def tenant_scoring_agent(state: TenantResearchState) -> TenantResearchState:
+def tenant_scoring_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Calculates tenant scores"""
     print("📊 Calculating tenant scores...")
     
+    # Every input is read once up front
+    years = state.years_in_business
+    verified = state.is_verified
+    has_locations = bool(state.current_locations)
+    review_sentiment = state.review_sentiment
+    growth_indicators = state.growth_indicators
+    risk_score = state.risk_score
+    
     # Creditworthiness indicators
-    state['creditworthiness_indicators'] = []
-    
-    if state['estimated_revenue'] != "Not disclosed":
-        state['creditworthiness_indicators'].append("Revenue verified")
-    if state['years_in_business'] and state['years_in_business'] > 3:
-        state['creditworthiness_indicators'].append(f"Established ({state['years_in_business']} years)")
-    if state['is_verified']:
-        state['creditworthiness_indicators'].append("Verified entity")
-    if state['review_sentiment'] > 0.7:
-        state['creditworthiness_indicators'].append("Strong reputation")
-    if state['current_locations']:
-        state['creditworthiness_indicators'].append("Existing tenant")
+    creditworthiness = []
+    
+    if state.revenue_usd is not None:
+        creditworthiness.append("Revenue verified")
+    if years and years > 3:
+        creditworthiness.append(f"Established ({years} years)")
+    if verified:
+        creditworthiness.append("Verified entity")
+    if review_sentiment > 0.7:
+        creditworthiness.append("Strong reputation")
+    if has_locations:
+        creditworthiness.append("Existing tenant")
     
     # Stability score
-    stability_components = {
-        'years': min((state['years_in_business'] or 0) / 10, 1.0) * 0.3,
-        'verified': 0.2 if state['is_verified'] else 0,
-        'locations': 0.2 if state['current_locations'] else 0,
-        'online': len(state['social_media_profiles']) / 5 * 0.3
-    }
-    state['stability_score'] = sum(stability_components.values())
+    stability_score = (
+        min((years or 0) / 10, 1.0) * 0.3 +
+        (0.2 if verified else 0) +
+        (0.2 if has_locations else 0) +
+        len(state.social_media_profiles) / 5 * 0.3
+    )
     
     # Growth potential
-    growth_components = {
-        'indicators': len(state['growth_indicators']) / 5 * 0.4,
-        'reviews': max(0, (state['review_sentiment'] - 0.5) * 2) * 0.3,
-        'size': 0.3 if state['employee_count'] != "Unknown" else 0
-    }
-    state['growth_potential'] = sum(growth_components.values())
+    growth_potential = (
+        len(growth_indicators) / 5 * 0.4 +
+        max(0, (review_sentiment - 0.5) * 2) * 0.3 +
+        (0.3 if state.employee_count_max is not None else 0)
+    )
     
     # Overall score
-    score_components = {
-        'stability': state['stability_score'] * 30,
-        'growth': state['growth_potential'] * 20,
-        'reputation': state['review_sentiment'] * 25,
-        'risk': (1 - state['risk_score']) * 25
-    }
-    state['overall_tenant_score'] = sum(score_components.values())
+    overall_score = (
+        stability_score * 30 +
+        growth_potential * 20 +
+        review_sentiment * 25 +
+        (1 - risk_score) * 25
+    )
     
     # Recommendation
-    if state['overall_tenant_score'] >= 75:
-        state['recommendation'] = "Highly Recommended"
-    elif state['overall_tenant_score'] >= 60:
-        state['recommendation'] = "Recommended"
-    elif state['overall_tenant_score'] >= 40:
-        state['recommendation'] = "Proceed with Caution"
-    else:
-        state['recommendation'] = "Not Recommended"
+    recommendation = RECOMMENDATIONS[bisect.bisect_right(RECOMMENDATION_THRESHOLDS, overall_score)]
     
     # Key factors
-    state['key_concerns'] = []
-    state['positive_factors'] = []
-    
-    if state['risk_score'] > 0.5:
-        state['key_concerns'].append("Elevated risk profile")
-    if state['years_in_business'] and state['years_in_business'] < 2:
-        state['key_concerns'].append("Very new business")
-    if not state['current_locations']:
-        state['key_concerns'].append("No verified locations")
-    
-    if state['stability_score'] > 0.7:
-        state['positive_factors'].append("High stability")
-    if state['review_sentiment'] > 0.8:
-        state['positive_factors'].append("Excellent reputation")
-    if state['growth_indicators']:
-        state['positive_factors'].append("Growth potential")
-    
-    state['messages'].append(f"✓ Tenant score: {state['overall_tenant_score']:.1f}/100")
-    state['messages'].append(f"✓ Recommendation: {state['recommendation']}")
-    
-    return state
+    key_concerns = []
+    positive_factors = []
+    
+    if risk_score > 0.5:
+        key_concerns.append("Elevated risk profile")
+    if years and years < 2:
+        key_concerns.append("Very new business")
+    if not has_locations:
+        key_concerns.append("No verified locations")
+    
+    if stability_score > 0.7:
+        positive_factors.append("High stability")
+    if review_sentiment > 0.8:
+        positive_factors.append("Excellent reputation")
+    if growth_indicators:
+        positive_factors.append("Growth potential")
+    
+    return {
+        "creditworthiness_indicators": creditworthiness,
+        "stability_score": stability_score,
+        "growth_potential": growth_potential,
+        "overall_tenant_score": overall_score,
+        "recommendation": recommendation,
+        "key_concerns": key_concerns,
+        "positive_factors": positive_factors,
+        "messages": [
+            f"✓ Tenant score: {overall_score:.1f}/100",
+            f"✓ Recommendation: {recommendation}"
+        ]
+    }
 
-def report_generator_agent(state: TenantResearchState) -> TenantResearchState:
+def report_generator_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Generates final report"""
     print("📝 Generating report...")
     
     # Confidence level
     data_completeness = [
-        state['website_url'] is not None,
-        bool(state['social_media_profiles']),
-        state['years_in_business'] is not None,
-        state['estimated_revenue'] != "Not disclosed",
-        bool(state['current_locations']),
-        state['is_verified']
+        state.website_url is not None,
+        bool(state.social_media_profiles),
+        state.years_in_business is not None,
+        state.revenue_usd is not None,
+        bool(state.current_locations),
+        state.is_verified
+    ]
+    confidence_level = sum(data_completeness) / len(data_completeness)
+    
+    # Executive summary, assembled line by line; empty sections are skipped
+    parts = [
+        "",
+        f"🏢 TENANT EVALUATION: {state.company_name}",
+        "=" * 60,
+        f"Location: {state.location} | Industry: {state.industry}",
+        "",
+        f"⭐ RECOMMENDATION: {state.recommendation}",
+        f"📊 Tenant Score: {state.overall_tenant_score:.1f}/100",
+        "",
+        "KEY METRICS:",
+        f"• Years in Business: {state.years_in_business or 'Unknown'}",
+        f"• Business Type: {state.business_type}",
+        f"• Verification: {'✓ Verified' if state.is_verified else '⚠️ Unverified'}",
+        f"• Revenue: {state.estimated_revenue}",
+        f"• Employees: {state.employee_count}",
+        f"• Current Locations: {len(state.current_locations)}",
+        "",
+        "SCORES:",
+        f"• Stability: {state.stability_score:.2f}/1.0",
+        f"• Growth Potential: {state.growth_potential:.2f}/1.0",
+        f"• Risk Level: {state.risk_score:.2f}/1.0 (lower is better)",
+        f"• Online Reputation: {state.review_sentiment:.2f}/1.0",
+        ""
     ]
-    state['confidence_level'] = sum(data_completeness) / len(data_completeness)
     
-    # Executive summary
-    state['executive_summary'] = f"""
-🏢 TENANT EVALUATION: {state['company_name']}
-{'='*60}
-Location: {state['location']} | Industry: {state['industry']}
-
-⭐ RECOMMENDATION: {state['recommendation']}
-📊 Tenant Score: {state['overall_tenant_score']:.1f}/100
-
-KEY METRICS:
-• Years in Business: {state['years_in_business'] or 'Unknown'}
-• Business Type: {state['business_type']}
-• Verification: {'✓ Verified' if state['is_verified'] else '⚠️ Unverified'}
-• Revenue: {state['estimated_revenue']}
-• Employees: {state['employee_count']}
-• Current Locations: {len(state['current_locations'])}
-
-SCORES:
-• Stability: {state['stability_score']:.2f}/1.0
-• Growth Potential: {state['growth_potential']:.2f}/1.0
-• Risk Level: {state['risk_score']:.2f}/1.0 (lower is better)
-• Online Reputation: {state['review_sentiment']:.2f}/1.0
-
-{'🟢 STRENGTHS:' if state['positive_factors'] else ''}
-{chr(10).join(f'  • {f}' for f in state['positive_factors'])}
-
-{'🔴 CONCERNS:' if state['key_concerns'] else ''}
-{chr(10).join(f'  • {c}' for c in state['key_concerns'])}
-
-📈 Confidence Level: {state['confidence_level']*100:.0f}%
-📚 Data Sources: {len(set(state['data_sources']))}
-"""
+    if state.positive_factors:
+        parts.append("🟢 STRENGTHS:")
+        parts.extend(f"  • {f}" for f in state.positive_factors)
+        parts.append("")
+    
+    if state.key_concerns:
+        parts.append("🔴 CONCERNS:")
+        parts.extend(f"  • {c}" for c in state.key_concerns)
+        parts.append("")
     
-    state['messages'].append("✓ Report complete")
-    return state
+    parts.append(f"📈 Confidence Level: {confidence_level*100:.0f}%")
+    parts.append(f"📚 Data Sources: {len(set(state.data_sources))}")
+    parts.append("")
+    
+    return {
+        "confidence_level": confidence_level,
+        "executive_summary": "\n".join(parts),
+        "messages": ["✓ Report complete"]
+    }
+
+def make_initial_state(company_name: str, location: str) -> Dict[str, Any]:
+    """Builds the starting state for one tenant evaluation"""
+    # Only the inputs are set; every other field starts from its dataclass
+    # default when the first agent receives the state
+    return {"company_name": company_name, "location": location}
 
 # Build the workflow
 def create_tenant_research_graph():
@@ -433,19 +529,17 @@ def create_tenant_research_graph():
 
 # Main execution
 if __name__ == "__main__":
-    from IPython.display import Image, display
-    
     # Create graph
     graph = create_tenant_research_graph()
     
-    # Save visualization
-    try:
-        img = Image(graph.get_graph().draw_mermaid_png())
-        with open("faropoint_workflow.png", "wb") as f:
-            f.write(img.data)
-        print("📊 Workflow diagram saved!")
-    except:
-        pass
+    # Save visualization (renders through mermaid.ink, so opt-in only)
+    if os.getenv("RENDER_GRAPH") == "1":
+        try:
+            with open("faropoint_workflow.png", "wb") as f:
+                f.write(graph.get_graph().draw_mermaid_png())
+            print("📊 Workflow diagram saved!")
+        except Exception:
+            pass
     
     print("\n🎨 Tenant Research Workflow:")
     print(graph.get_graph().draw_mermaid())
@@ -461,49 +555,17 @@ if __name__ == "__main__":
         {"name": "GreenSpace Wellness", "location": "San Francisco, CA"},
     ]
     
-    for company in test_companies:
+    # The evaluations share no state, so run them as one batch
+    results = graph.batch([
+        make_initial_state(company['name'], company['location'])
+        for company in test_companies
+    ])
+    
+    for company, result in zip(test_companies, results):
         print(f"\n{'='*70}")
         print(f"Researching: {company['name']}")
         print(f"{'='*70}")
         
-        initial_state = {
-            "company_name": company['name'],
-            "location": company['location'],
-            "industry": "",
-            "website_url": None,
-            "social_media_profiles": {},
-            "online_reviews": [],
-            "review_sentiment": 0.5,
-            "business_registration": {},
-            "years_in_business": None,
-            "business_type": "",
-            "is_verified": False,
-            "estimated_revenue": None,
-            "employee_count": None,
-            "growth_indicators": [],
-            "current_locations": [],
-            "space_requirements": None,
-            "lease_history": [],
-            "litigation_history": [],
-            "bankruptcy_flags": False,
-            "negative_news": [],
-            "risk_score": 0.5,
-            "creditworthiness_indicators": [],
-            "stability_score": 0.0,
-            "growth_potential": 0.0,
-            "overall_tenant_score": 0.0,
-            "recommendation": "Not Recommended",
-            "executive_summary": "",
-            "key_concerns": [],
-            "positive_factors": [],
-            "messages": [],
-            "data_sources": [],
-            "confidence_level": 0.0
-        }
-        
-        # Run research
-        result = graph.invoke(initial_state)
-        
         # Display report
         print(result['executive_summary'])
         
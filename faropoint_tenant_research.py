@@ -5,590 +5,825 @@ Uses web search and analysis to gather intelligence on businesses
 """
 
 import os
-from typing import TypedDict, Literal, List, Dict, Any, Annotated, Optional
+from typing import Literal, List, Dict, Any, Annotated, Optional, Tuple, Callable, Set
 from langgraph.graph import StateGraph, START, END
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_community.document_loaders import WebBaseLoader
+from dataclasses import dataclass, field
 from datetime import datetime
-import json
+from functools import lru_cache
 import operator
+import asyncio
 import re
+import time
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
+from collections import OrderedDict
 from urllib.parse import urlparse
 import requests
-from bs4 import BeautifulSoup
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+from pydantic import BaseModel, Field
 
-# Initialize tools
-search_tool = DuckDuckGoSearchRun()
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# Tools are built on first use, so importing the module (e.g. just to draw
+# the graph) needs neither OPENAI_API_KEY nor an HTTP client
+@lru_cache(maxsize=None)
+def get_llm() -> ChatOpenAI:
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0)
+
+# DuckDuckGo's HTML endpoint, queried through one pooled client per run so
+# searches after the first reuse open keep-alive connections
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+SEARCH_PAGE_MAX_BYTES = 256 * 1024  # result pages past this are cut off mid-read
+EXCERPT_LENGTH = 1000  # characters of each search result passed to the LLM
+
+# The client searches go through. httpx ties pooled connections to the event
+# loop that opened them, so a client lives only as long as the run using it
+http_client: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("http_client", default=None)
+
+@asynccontextmanager
+async def pooled_http_client():
+    """Shares one pooled client across the searches made inside the block"""
+    if http_client.get() is not None:
+        yield
+        return
+    async with httpx.AsyncClient(
+        headers={"User-Agent": "Mozilla/5.0 (compatible; FaropointTenantResearch/1.0)"},
+        limits=httpx.Limits(max_keepalive_connections=20),
+        timeout=10.0,
+        follow_redirects=True
+    ) as client:
+        token = http_client.set(client)
+        try:
+            yield
+        finally:
+            http_client.reset(token)
+
+# Founding years are converted to company age against the year at startup
+CURRENT_YEAR = datetime.now().year
+
+# Extraction patterns, compiled once for every company researched
+URL_PATTERN = re.compile(r'https?://(?:www\.)?[\w\-\.]+\.(?:com|net|org|biz|info|co)')
+SOCIAL_PATTERNS = {
+    'linkedin': re.compile(r'linkedin\.com/company/[\w\-]+'),
+    'facebook': re.compile(r'facebook\.com/[\w\-\.]+'),
+    'instagram': re.compile(r'instagram\.com/[\w\-\.]+'),
+    'twitter': re.compile(r'twitter\.com/[\w\-]+')
+}
+FOUNDING_YEAR_PATTERN = re.compile(r'(?:established|founded|since|incorporated) (\d{4})')
+# Each alternation is searched once and yields its earliest match in the text
+ENTITY_TYPES = ['LLC', 'Corporation', 'Corp', 'Inc', 'Limited', 'Partnership', 'LLP']
+ENTITY_PATTERN = re.compile(r'\b(' + '|'.join(ENTITY_TYPES) + r')\b', re.IGNORECASE)
+ENTITY_NAMES = {entity.lower(): entity for entity in ENTITY_TYPES}
+REVENUE_PATTERN = re.compile(
+    r'\$(\d+(?:\.\d+)?)\s*(?:million|M)'
+    r'|\$(\d+(?:\.\d+)?)\s*(?:billion|B)'
+    r'|\$(\d+(?:,\d+)*)\s*(?:in revenue|annual revenue|sales)'
+    r'|revenue of \$(\d+(?:,\d+)*)'
+)
+EMPLOYEE_PATTERN = re.compile(
+    r'(\d+)-(\d+)\s*employees'
+    r'|(\d+)\s*employees'
+    r'|(\d+)\s*staff'
+    r'|team of (\d+)'
+)
+ADDRESS_PATTERN = re.compile(r'\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Parkway|Pkwy)')
+SPACE_PATTERN = re.compile(r'(\d+(?:,\d+)?)\s*(?:square feet|sq ft|sf|square meters|sq m)')
+
+def first_group(match: "re.Match[str]") -> str:
+    """Returns the captured value of whichever alternative matched"""
+    return next(group for group in match.groups() if group is not None)
+
+def keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    """Compiles keywords into one alternation so a text is scanned once for all of them"""
+    return re.compile("|".join(re.escape(kw) for kw in sorted(keywords, key=len, reverse=True)))
+
+def find_keywords(pattern: "re.Pattern[str]", keywords: List[str], text: str) -> List[str]:
+    """Returns the keywords found in already-lowercased text, in keyword order"""
+    found = set(pattern.findall(text))
+    return [kw for kw in keywords if kw in found]
+
+GROWTH_KEYWORDS = ['expanding', 'growth', 'hiring', 'new location', 'increased revenue', 'record sales']
+LITIGATION_KEYWORDS = ['lawsuit', 'sued', 'litigation', 'court case', 'legal action', 'defendant']
+BANKRUPTCY_KEYWORDS = ['bankruptcy', 'chapter 7', 'chapter 11', 'insolvent', 'financial distress']
+NEGATIVE_KEYWORDS = ['scandal', 'violation', 'fine', 'penalty', 'complaint', 'investigation']
+GROWTH_PATTERN = keyword_pattern(GROWTH_KEYWORDS)
+LITIGATION_PATTERN = keyword_pattern(LITIGATION_KEYWORDS)
+BANKRUPTCY_PATTERN = keyword_pattern(BANKRUPTCY_KEYWORDS)
+NEGATIVE_PATTERN = keyword_pattern(NEGATIVE_KEYWORDS)
 
 # Define the state for tenant research
-class TenantResearchState(TypedDict):
+@dataclass(slots=True)
+class TenantResearchState:
     # Company Information
-    company_name: str
-    location: str
-    industry: str
+    company_name: str = ""
+    location: str = ""
+    industry: str = ""
     
     # Online Presence
-    website_url: Optional[str]
-    social_media_profiles: Dict[str, str]
-    online_reviews: List[Dict]
-    review_sentiment: float
+    website_url: Optional[str] = None
+    social_media_profiles: Dict[str, str] = field(default_factory=dict)
+    online_reviews: List[Dict] = field(default_factory=list)
+    review_sentiment: float = 0.5
     
     # Business Verification
-    business_registration: Dict[str, Any]
-    years_in_business: Optional[int]
-    business_type: str  # LLC, Corp, etc.
-    is_verified: bool
+    business_registration: Dict[str, Any] = field(default_factory=dict)
+    years_in_business: Optional[int] = None
+    business_type: str = ""  # LLC, Corp, etc.
+    is_verified: bool = False
     
     # Financial Indicators (from public data)
-    estimated_revenue: Optional[str]
-    employee_count: Optional[str]
-    growth_indicators: List[str]
+    estimated_revenue: Optional[str] = None
+    employee_count: Optional[str] = None
+    growth_indicators: List[str] = field(default_factory=list)
     
     # Real Estate Relevant
-    current_locations: List[str]
-    space_requirements: Optional[str]
-    lease_history: List[Dict]
+    current_locations: List[str] = field(default_factory=list)
+    space_requirements: Optional[str] = None
+    lease_history: List[Dict] = field(default_factory=list)
     
     # Risk Assessment
-    litigation_history: List[str]
-    bankruptcy_flags: bool
-    negative_news: List[str]
-    risk_score: float  # 0-1, lower is better
+    litigation_history: List[str] = field(default_factory=list)
+    bankruptcy_flags: bool = False
+    negative_news: List[str] = field(default_factory=list)
+    risk_score: float = 0.5  # 0-1, lower is better
     
     # Tenant Quality Score
-    creditworthiness_indicators: List[str]
-    stability_score: float  # 0-1, higher is better
-    growth_potential: float  # 0-1
-    overall_tenant_score: float  # 0-100
+    creditworthiness_indicators: List[str] = field(default_factory=list)
+    stability_score: float = 0.0  # 0-1, higher is better
+    growth_potential: float = 0.0  # 0-1
+    overall_tenant_score: float = 0.0  # 0-100
     
     # Final Outputs
-    recommendation: Literal["Highly Recommended", "Recommended", "Proceed with Caution", "Not Recommended"]
-    executive_summary: str
-    detailed_report: str
-    key_concerns: List[str]
-    positive_factors: List[str]
+    recommendation: Literal["Highly Recommended", "Recommended", "Proceed with Caution", "Not Recommended"] = "Not Recommended"
+    executive_summary: str = ""
+    detailed_report: str = ""
+    key_concerns: List[str] = field(default_factory=list)
+    positive_factors: List[str] = field(default_factory=list)
     
     # Workflow Management
-    messages: Annotated[List[str], operator.add]
-    data_sources: List[str]
-    search_queries_used: List[str]
-    confidence_level: float
+    messages: Annotated[List[str], operator.add] = field(default_factory=list)
+    data_sources: Annotated[Set[str], operator.or_] = field(default_factory=set)
+    search_queries_used: Annotated[List[str], operator.add] = field(default_factory=list)
+    search_excerpts: Annotated[List[str], operator.add] = field(default_factory=list)  # raw text for the LLM extraction
+    confidence_level: float = 0.0
+
+# Everything the LLM pulls out of the search excerpts, in one structured call
+class TenantFacts(BaseModel):
+    industry: Optional[str] = Field(None, description="Industry or line of business")
+    website_url: Optional[str] = Field(None, description="Company website URL")
+    founding_year: Optional[int] = Field(None, description="Year the company was founded")
+    business_type: Optional[str] = Field(None, description="Legal entity type, e.g. LLC or Corp")
+    review_rating: Optional[float] = Field(None, description="Average review rating out of 5")
+    review_count: Optional[int] = Field(None, description="Number of reviews")
+    positive_themes: List[str] = Field(default_factory=list, description="Common positive review themes")
+    negative_themes: List[str] = Field(default_factory=list, description="Common review complaints")
+    sentiment: Optional[Literal["positive", "neutral", "negative"]] = Field(None, description="Overall review sentiment")
+    estimated_revenue: Optional[str] = Field(None, description="Estimated annual revenue")
+    employee_count: Optional[str] = Field(None, description="Number of employees or a range")
+    growth_indicators: List[str] = Field(default_factory=list, description="Signs of growth or expansion")
+
+# Searches issued during one research run, keyed by normalized query.
+# Entries are tasks, so parallel agents asking the same thing share one
+# request even while it is still in flight
+search_cache: ContextVar[Optional[Dict[str, asyncio.Task]]] = ContextVar("search_cache", default=None)
+
+# Search results are stable from run to run, so successful searches are
+# reused across runs for a day. Failed and empty searches are not stored,
+# so the next run retries them instead of being served the failure. The
+# least recently used entries go first once SEARCH_RESULT_CACHE_SIZE is hit.
+SEARCH_RESULT_TTL = 86400  # seconds
+SEARCH_RESULT_CACHE_SIZE = 1024
+search_results: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+async def web_search(query: str) -> str:
+    """Runs a DuckDuckGo search, reusing results already fetched in this research run"""
+    key = " ".join(query.lower().split())
+    cache = search_cache.get()
+    if cache is None:
+        return await _lookup_search(key, query)
+    
+    if key not in cache:
+        cache[key] = asyncio.ensure_future(_lookup_search(key, query))
+    return await cache[key]
+
+async def _lookup_search(key: str, query: str) -> str:
+    """Returns a search result fetched within SEARCH_RESULT_TTL, or fetches it"""
+    hit = search_results.get(key)
+    if hit is not None:
+        if time.monotonic() - hit[0] < SEARCH_RESULT_TTL:
+            search_results.move_to_end(key)
+            return hit[1]
+        del search_results[key]
+    
+    result = await _fetch_search(query)
+    if result:
+        search_results[key] = (time.monotonic(), result)
+        search_results.move_to_end(key)
+        if len(search_results) > SEARCH_RESULT_CACHE_SIZE:
+            search_results.popitem(last=False)
+    return result
+
+async def _fetch_search(query: str) -> str:
+    """Runs a DuckDuckGo search and returns the result snippets as one string"""
+    client = http_client.get()
+    if client is None:
+        # Searched outside a research run; the client serves just this query
+        async with pooled_http_client():
+            return await _fetch_search(query)
+    
+    # Read at most SEARCH_PAGE_MAX_BYTES of the page; Lexbor parses a
+    # truncated document without complaint
+    body = bytearray()
+    async with client.stream("POST", SEARCH_URL, data={"q": query}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) >= SEARCH_PAGE_MAX_BYTES:
+                break
+    tree = LexborHTMLParser(bytes(body[:SEARCH_PAGE_MAX_BYTES]))
+    return " ".join(snippet.text(separator=" ", strip=True) for snippet in tree.css(".result__snippet"))
 
 # Agent functions
+#
+# The research agents run as parallel branches, so each returns only the
+# fields it produced; list fields shared between branches are merged by
+# their reducers
 
-def company_identifier_agent(state: TenantResearchState) -> TenantResearchState:
+async def company_identifier_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Identifies the company and gathers basic information"""
-    print(f"🔍 Identifying company: {state['company_name']} in {state['location']}...")
+    print(f"🔍 Identifying company: {state.company_name} in {state.location}...")
     
     # Search for company information
-    search_query = f"{state['company_name']} {state['location']} company business"
-    state['search_queries_used'].append(search_query)
+    search_query = f"{state.company_name} {state.location} company business"
+    update = {"search_queries_used": [search_query], "data_sources": set(), "messages": []}
     
     try:
-        search_results = search_tool.run(search_query)
-        state['data_sources'].append("DuckDuckGo Search")
-        
-        # Use LLM to extract company info
-        prompt = f"""
-        Extract company information from these search results:
-        {search_results[:1000]}
-        
-        For company: {state['company_name']}
-        Location: {state['location']}
-        
-        Extract:
-        1. Industry/Business Type
-        2. Any website URL mentioned
-        3. Years in business or founding date
-        4. Business type (LLC, Corp, etc)
-        
-        Format as JSON.
-        """
-        
-        response = llm.invoke([SystemMessage(content=prompt)])
+        search_results = await web_search(search_query)
+        update['data_sources'].add("DuckDuckGo Search")
+        update['search_excerpts'] = [search_results[:EXCERPT_LENGTH]]
         
         # Update state with findings
-        state['messages'].append(f"✓ Initial search completed for {state['company_name']}")
+        update['messages'].append(f"✓ Initial search completed for {state.company_name}")
         
         # Try to extract website
-        url_pattern = r'https?://(?:www\.)?[\w\-\.]+\.(?:com|net|org|biz|info|co)'
-        urls = re.findall(url_pattern, search_results)
+        urls = URL_PATTERN.findall(search_results)
         if urls:
-            state['website_url'] = urls[0]
-            state['messages'].append(f"✓ Found website: {urls[0]}")
+            update['website_url'] = urls[0]
+            update['messages'].append(f"✓ Found website: {urls[0]}")
             
     except Exception as e:
-        state['messages'].append(f"⚠️ Error in initial search: {str(e)}")
+        update['messages'].append(f"⚠️ Error in initial search: {str(e)}")
     
-    return state
+    return update
 
-def online_presence_analyzer(state: TenantResearchState) -> TenantResearchState:
+async def online_presence_analyzer(state: TenantResearchState) -> Dict[str, Any]:
     """Analyzes the company's online presence and reputation"""
     print("🌐 Analyzing online presence...")
     
     # Search for social media profiles
-    social_search = f"{state['company_name']} {state['location']} LinkedIn Facebook Instagram"
-    state['search_queries_used'].append(social_search)
+    social_search = f"{state.company_name} {state.location} LinkedIn Facebook Instagram"
+    review_search = f"{state.company_name} {state.location} reviews Google Yelp"
+    update = {"search_queries_used": [social_search, review_search], "data_sources": set(), "messages": []}
     
     try:
-        social_results = search_tool.run(social_search)
+        social_results, review_results = await asyncio.gather(
+            web_search(social_search),
+            web_search(review_search)
+        )
         
         # Extract social media URLs
-        social_patterns = {
-            'linkedin': r'linkedin\.com/company/[\w\-]+',
-            'facebook': r'facebook\.com/[\w\-\.]+',
-            'instagram': r'instagram\.com/[\w\-\.]+',
-            'twitter': r'twitter\.com/[\w\-]+'
-        }
-        
-        state['social_media_profiles'] = {}
-        for platform, pattern in social_patterns.items():
-            matches = re.findall(pattern, social_results)
+        update['social_media_profiles'] = {}
+        for platform, pattern in SOCIAL_PATTERNS.items():
+            matches = pattern.findall(social_results)
             if matches:
-                state['social_media_profiles'][platform] = f"https://{matches[0]}"
-        
-        if state['social_media_profiles']:
-            state['messages'].append(f"✓ Found {len(state['social_media_profiles'])} social media profiles")
-        
-        # Search for reviews
-        review_search = f"{state['company_name']} {state['location']} reviews Google Yelp"
-        state['search_queries_used'].append(review_search)
-        review_results = search_tool.run(review_search)
-        
-        # Extract review information
-        prompt = f"""
-        Extract review information from these search results:
-        {review_results[:1000]}
+                update['social_media_profiles'][platform] = f"https://{matches[0]}"
         
-        Look for:
-        1. Average rating (out of 5)
-        2. Number of reviews
-        3. Common positive themes
-        4. Common complaints
-        5. Overall sentiment (positive/neutral/negative)
+        if update['social_media_profiles']:
+            update['messages'].append(f"✓ Found {len(update['social_media_profiles'])} social media profiles")
         
-        Format as JSON with 'rating', 'review_count', 'positive_themes', 'negative_themes', 'sentiment'
-        """
-        
-        review_response = llm.invoke([SystemMessage(content=prompt)])
+        # Review details are extracted later, together with the other excerpts
+        update['search_excerpts'] = [review_results[:EXCERPT_LENGTH]]
         
         # Simple sentiment scoring
-        if "positive" in review_results.lower():
-            state['review_sentiment'] = 0.7
-        elif "negative" in review_results.lower():
-            state['review_sentiment'] = 0.3
+        review_text = review_results.lower()
+        if "positive" in review_text:
+            update['review_sentiment'] = 0.7
+        elif "negative" in review_text:
+            update['review_sentiment'] = 0.3
         else:
-            state['review_sentiment'] = 0.5
+            update['review_sentiment'] = 0.5
             
-        state['messages'].append(f"✓ Review sentiment score: {state['review_sentiment']:.2f}")
-        state['data_sources'].append("Online Reviews")
+        update['messages'].append(f"✓ Review sentiment score: {update['review_sentiment']:.2f}")
+        update['data_sources'].add("Online Reviews")
         
     except Exception as e:
-        state['messages'].append(f"⚠️ Error analyzing online presence: {str(e)}")
-        state['review_sentiment'] = 0.5  # neutral default
+        update['messages'].append(f"⚠️ Error analyzing online presence: {str(e)}")
+        update['review_sentiment'] = 0.5  # neutral default
     
-    return state
+    return update
 
-def business_verification_agent(state: TenantResearchState) -> TenantResearchState:
+async def business_verification_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Verifies business registration and legitimacy"""
     print("📋 Verifying business registration...")
     
     # Search for business registration
-    registration_search = f"{state['company_name']} {state['location']} Secretary of State business registration LLC corporation"
-    state['search_queries_used'].append(registration_search)
+    registration_search = f"{state.company_name} {state.location} Secretary of State business registration LLC corporation"
+    update = {"search_queries_used": [registration_search], "data_sources": set(), "messages": []}
     
     try:
-        registration_results = search_tool.run(registration_search)
+        registration_results = await web_search(registration_search)
+        update['search_excerpts'] = [registration_results[:EXCERPT_LENGTH]]
         
         # Check for business entity indicators
-        entity_types = ['LLC', 'Corporation', 'Corp', 'Inc', 'Limited', 'Partnership', 'LLP']
-        for entity in entity_types:
-            if entity.lower() in registration_results.lower():
-                state['business_type'] = entity
-                break
+        registration_text = registration_results.lower()
+        entity = ENTITY_PATTERN.search(registration_results)
+        if entity:
+            update['business_type'] = ENTITY_NAMES[entity.group(1).lower()]
         
         # Look for registration indicators
-        if any(term in registration_results.lower() for term in ['registered', 'incorporated', 'established']):
-            state['is_verified'] = True
-            state['messages'].append("✓ Business registration verified")
+        if any(term in registration_text for term in ['registered', 'incorporated', 'established']):
+            update['is_verified'] = True
+            update['messages'].append("✓ Business registration verified")
         else:
-            state['is_verified'] = False
-            state['messages'].append("⚠️ Could not verify business registration")
+            update['is_verified'] = False
+            update['messages'].append("⚠️ Could not verify business registration")
         
         # Extract years in business
-        year_patterns = [
-            r'established (\d{4})',
-            r'founded (\d{4})',
-            r'since (\d{4})',
-            r'incorporated (\d{4})'
-        ]
-        
-        for pattern in year_patterns:
-            matches = re.findall(pattern, registration_results.lower())
-            if matches:
-                founding_year = int(matches[0])
-                state['years_in_business'] = datetime.now().year - founding_year
-                state['messages'].append(f"✓ Years in business: {state['years_in_business']}")
-                break
+        match = FOUNDING_YEAR_PATTERN.search(registration_text)
+        if match:
+            founding_year = int(match.group(1))
+            update['years_in_business'] = CURRENT_YEAR - founding_year
+            update['messages'].append(f"✓ Years in business: {update['years_in_business']}")
         
-        state['data_sources'].append("Business Registration Search")
+        update['data_sources'].add("Business Registration Search")
         
     except Exception as e:
-        state['messages'].append(f"⚠️ Error in business verification: {str(e)}")
-        state['is_verified'] = False
+        update['messages'].append(f"⚠️ Error in business verification: {str(e)}")
+        update['is_verified'] = False
     
-    return state
+    return update
 
-def financial_indicators_agent(state: TenantResearchState) -> TenantResearchState:
+async def financial_indicators_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Gathers financial indicators from public sources"""
     print("💰 Analyzing financial indicators...")
     
     # Search for revenue and employee information
-    financial_search = f"{state['company_name']} {state['location']} revenue employees annual sales"
-    state['search_queries_used'].append(financial_search)
+    financial_search = f"{state.company_name} {state.location} revenue employees annual sales"
+    update = {"search_queries_used": [financial_search], "data_sources": set(), "messages": []}
     
     try:
-        financial_results = search_tool.run(financial_search)
+        financial_results = await web_search(financial_search)
+        update['search_excerpts'] = [financial_results[:EXCERPT_LENGTH]]
         
         # Extract revenue indicators
-        revenue_patterns = [
-            r'\$(\d+(?:\.\d+)?)\s*(?:million|M)',
-            r'\$(\d+(?:\.\d+)?)\s*(?:billion|B)',
-            r'\$(\d+(?:,\d+)*)\s*(?:in revenue|annual revenue|sales)',
-            r'revenue of \$(\d+(?:,\d+)*)'
-        ]
-        
-        for pattern in revenue_patterns:
-            matches = re.findall(pattern, financial_results)
-            if matches:
-                state['estimated_revenue'] = matches[0]
-                state['messages'].append(f"✓ Estimated revenue found: ${matches[0]}")
-                break
+        revenue = REVENUE_PATTERN.search(financial_results)
+        if revenue:
+            update['estimated_revenue'] = first_group(revenue)
+            update['messages'].append(f"✓ Estimated revenue found: ${update['estimated_revenue']}")
         
         # Extract employee count
-        employee_patterns = [
-            r'(\d+)\s*employees',
-            r'(\d+)\s*staff',
-            r'team of (\d+)',
-            r'(\d+)-(\d+)\s*employees'
-        ]
-        
-        for pattern in employee_patterns:
-            matches = re.findall(pattern, financial_results)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    state['employee_count'] = f"{matches[0][0]}-{matches[0][1]}"
-                else:
-                    state['employee_count'] = matches[0]
-                state['messages'].append(f"✓ Employee count: {state['employee_count']}")
-                break
+        employees = EMPLOYEE_PATTERN.search(financial_results)
+        if employees:
+            if employees.group(1):
+                update['employee_count'] = f"{employees.group(1)}-{employees.group(2)}"
+            else:
+                update['employee_count'] = first_group(employees)
+            update['messages'].append(f"✓ Employee count: {update['employee_count']}")
         
         # Look for growth indicators
-        growth_keywords = ['expanding', 'growth', 'hiring', 'new location', 'increased revenue', 'record sales']
-        state['growth_indicators'] = [kw for kw in growth_keywords if kw in financial_results.lower()]
+        update['growth_indicators'] = find_keywords(GROWTH_PATTERN, GROWTH_KEYWORDS, financial_results.lower())
         
-        if state['growth_indicators']:
-            state['messages'].append(f"✓ Growth indicators: {', '.join(state['growth_indicators'])}")
+        if update['growth_indicators']:
+            update['messages'].append(f"✓ Growth indicators: {', '.join(update['growth_indicators'])}")
         
-        state['data_sources'].append("Financial Indicators Search")
+        update['data_sources'].add("Financial Indicators Search")
         
     except Exception as e:
-        state['messages'].append(f"⚠️ Error gathering financial indicators: {str(e)}")
+        update['messages'].append(f"⚠️ Error gathering financial indicators: {str(e)}")
     
-    return state
+    return update
 
-def real_estate_history_agent(state: TenantResearchState) -> TenantResearchState:
+async def real_estate_history_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Researches real estate and lease history"""
     print("🏢 Researching real estate history...")
     
     # Search for current locations and lease history
-    location_search = f"{state['company_name']} {state['location']} office location address lease space"
-    state['search_queries_used'].append(location_search)
+    location_search = f"{state.company_name} {state.location} office location address lease space"
+    lease_search = f"{state.company_name} moved relocated new office expansion"
+    update = {"search_queries_used": [location_search, lease_search], "data_sources": set(), "messages": []}
     
     try:
-        location_results = search_tool.run(location_search)
+        location_results, lease_results = await asyncio.gather(
+            web_search(location_search),
+            web_search(lease_search)
+        )
         
         # Extract addresses
-        address_pattern = r'\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln|Way|Parkway|Pkwy)'
-        addresses = re.findall(address_pattern, location_results)
+        addresses = ADDRESS_PATTERN.findall(location_results)
         
         if addresses:
-            state['current_locations'] = list(set(addresses[:3]))  # Keep top 3 unique
-            state['messages'].append(f"✓ Found {len(state['current_locations'])} location(s)")
+            update['current_locations'] = list(dict.fromkeys(addresses[:3]))  # Keep top 3 unique
+            update['messages'].append(f"✓ Found {len(update['current_locations'])} location(s)")
         
         # Look for space requirements indicators
-        space_patterns = [
-            r'(\d+(?:,\d+)?)\s*(?:square feet|sq ft|sf)',
-            r'(\d+(?:,\d+)?)\s*(?:square meters|sq m)',
-        ]
-        
-        for pattern in space_patterns:
-            matches = re.findall(pattern, location_results)
-            if matches:
-                state['space_requirements'] = f"{matches[0]} sq ft"
-                state['messages'].append(f"✓ Space requirement indicator: {state['space_requirements']}")
-                break
-        
-        # Search for lease or relocation history
-        lease_search = f"{state['company_name']} moved relocated new office expansion"
-        state['search_queries_used'].append(lease_search)
-        lease_results = search_tool.run(lease_search)
+        space = SPACE_PATTERN.search(location_results)
+        if space:
+            update['space_requirements'] = f"{space.group(1)} sq ft"
+            update['messages'].append(f"✓ Space requirement indicator: {update['space_requirements']}")
         
         # Simple lease history based on keywords
-        if 'moved' in lease_results.lower() or 'relocated' in lease_results.lower():
-            state['lease_history'].append({
+        lease_text = lease_results.lower()
+        if 'moved' in lease_text or 'relocated' in lease_text:
+            update['lease_history'] = state.lease_history + [{
                 'event': 'Recent relocation detected',
                 'details': 'Company has moved offices recently'
-            })
+            }]
         
-        state['data_sources'].append("Real Estate History Search")
+        update['data_sources'].add("Real Estate History Search")
         
     except Exception as e:
-        state['messages'].append(f"⚠️ Error researching real estate history: {str(e)}")
+        update['messages'].append(f"⚠️ Error researching real estate history: {str(e)}")
     
-    return state
+    return update
 
-def risk_assessment_agent(state: TenantResearchState) -> TenantResearchState:
+async def risk_assessment_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Performs risk assessment including litigation and bankruptcy checks"""
     print("⚠️ Performing risk assessment...")
     
-    # Search for litigation
-    litigation_search = f"{state['company_name']} lawsuit litigation sued court case"
-    state['search_queries_used'].append(litigation_search)
+    # Search for litigation, bankruptcy and negative news
+    litigation_search = f"{state.company_name} lawsuit litigation sued court case"
+    bankruptcy_search = f"{state.company_name} bankruptcy Chapter 7 Chapter 11 financial distress"
+    negative_search = f"{state.company_name} scandal problem issue complaint violation"
+    update = {"search_queries_used": [litigation_search, bankruptcy_search, negative_search], "data_sources": set(), "messages": []}
     
     try:
-        litigation_results = search_tool.run(litigation_search)
+        litigation_results, bankruptcy_results, negative_results = await asyncio.gather(
+            web_search(litigation_search),
+            web_search(bankruptcy_search),
+            web_search(negative_search)
+        )
         
         # Check for litigation keywords
-        litigation_keywords = ['lawsuit', 'sued', 'litigation', 'court case', 'legal action', 'defendant']
-        found_litigation = [kw for kw in litigation_keywords if kw in litigation_results.lower()]
+        found_litigation = find_keywords(LITIGATION_PATTERN, LITIGATION_KEYWORDS, litigation_results.lower())
         
+        litigation_history = state.litigation_history
         if found_litigation:
-            state['litigation_history'].append(f"Potential litigation found: {', '.join(found_litigation)}")
-            state['messages'].append("⚠️ Litigation indicators detected")
-        
-        # Search for bankruptcy
-        bankruptcy_search = f"{state['company_name']} bankruptcy Chapter 7 Chapter 11 financial distress"
-        state['search_queries_used'].append(bankruptcy_search)
-        bankruptcy_results = search_tool.run(bankruptcy_search)
-        
-        bankruptcy_keywords = ['bankruptcy', 'chapter 7', 'chapter 11', 'insolvent', 'financial distress']
-        if any(kw in bankruptcy_results.lower() for kw in bankruptcy_keywords):
-            state['bankruptcy_flags'] = True
-            state['messages'].append("🚨 Bankruptcy indicators detected")
+            litigation_history = litigation_history + [f"Potential litigation found: {', '.join(found_litigation)}"]
+            update['litigation_history'] = litigation_history
+            update['messages'].append("⚠️ Litigation indicators detected")
+        
+        # Check for bankruptcy
+        if BANKRUPTCY_PATTERN.search(bankruptcy_results.lower()):
+            update['bankruptcy_flags'] = True
+            update['messages'].append("🚨 Bankruptcy indicators detected")
         else:
-            state['bankruptcy_flags'] = False
+            update['bankruptcy_flags'] = False
         
-        # Search for negative news
-        negative_search = f"{state['company_name']} scandal problem issue complaint violation"
-        state['search_queries_used'].append(negative_search)
-        negative_results = search_tool.run(negative_search)
-        
-        negative_keywords = ['scandal', 'violation', 'fine', 'penalty', 'complaint', 'investigation']
-        found_negative = [kw for kw in negative_keywords if kw in negative_results.lower()]
+        # Check for negative news
+        found_negative = find_keywords(NEGATIVE_PATTERN, NEGATIVE_KEYWORDS, negative_results.lower())
         
+        negative_news = state.negative_news
         if found_negative:
-            state['negative_news'] = found_negative
-            state['messages'].append(f"⚠️ Negative news indicators: {', '.join(found_negative)}")
+            negative_news = update['negative_news'] = found_negative
+            update['messages'].append(f"⚠️ Negative news indicators: {', '.join(found_negative)}")
         
-        # Calculate risk score
+        # Calculate risk score; the unverified-registration penalty is added
+        # by tenant scoring, since verification runs alongside this branch
         risk_factors = 0
-        if state['litigation_history']:
+        if litigation_history:
             risk_factors += 2
-        if state['bankruptcy_flags']:
+        if update['bankruptcy_flags']:
             risk_factors += 3
-        if state['negative_news']:
-            risk_factors += len(state['negative_news']) * 0.5
-        if not state['is_verified']:
-            risk_factors += 1
+        if negative_news:
+            risk_factors += len(negative_news) * 0.5
         
         # Normalize to 0-1 scale
-        state['risk_score'] = min(risk_factors / 10, 1.0)
-        state['messages'].append(f"✓ Risk score calculated: {state['risk_score']:.2f}")
+        update['risk_score'] = min(risk_factors / 10, 1.0)
+        update['messages'].append(f"✓ Risk score calculated: {update['risk_score']:.2f}")
         
-        state['data_sources'].append("Risk Assessment Search")
+        update['data_sources'].add("Risk Assessment Search")
         
     except Exception as e:
-        state['messages'].append(f"⚠️ Error in risk assessment: {str(e)}")
-        state['risk_score'] = 0.5  # Default medium risk
+        update['messages'].append(f"⚠️ Error in risk assessment: {str(e)}")
+        update['risk_score'] = 0.5  # Default medium risk
+    
+    return update
+
+async def batch_extract_agent(state: TenantResearchState) -> Dict[str, Any]:
+    """Extracts company facts from all search excerpts in a single LLM call"""
+    print("🧠 Extracting company facts...")
+    
+    if not state.search_excerpts:
+        return {"messages": ["⚠️ No search results to extract from"]}
+    
+    prompt = f"""
+    Extract company information from these search results:
+    {chr(10).join(state.search_excerpts)}
+    
+    For company: {state.company_name}
+    Location: {state.location}
     
-    return state
+    Leave a field empty when the results do not mention it.
+    """
+    
+    try:
+        facts = await get_llm().with_structured_output(TenantFacts).ainvoke([SystemMessage(content=prompt)])
+    except Exception as e:
+        return {"messages": [f"⚠️ Error extracting company facts: {str(e)}"]}
+    
+    update = {"messages": ["✓ Company facts extracted"]}
+    if facts.industry:
+        update['industry'] = facts.industry
+    if facts.review_rating is not None:
+        update['online_reviews'] = [{
+            'rating': facts.review_rating,
+            'review_count': facts.review_count,
+            'positive_themes': facts.positive_themes,
+            'negative_themes': facts.negative_themes,
+            'sentiment': facts.sentiment
+        }]
+    
+    # Pattern matches from the agents take precedence; the LLM fills gaps
+    if not state.website_url and facts.website_url:
+        update['website_url'] = facts.website_url
+    if not state.business_type and facts.business_type:
+        update['business_type'] = facts.business_type
+    if state.years_in_business is None and facts.founding_year:
+        update['years_in_business'] = CURRENT_YEAR - facts.founding_year
+    if not state.estimated_revenue and facts.estimated_revenue:
+        update['estimated_revenue'] = facts.estimated_revenue
+    if not state.employee_count and facts.employee_count:
+        update['employee_count'] = facts.employee_count
+    if not state.growth_indicators and facts.growth_indicators:
+        update['growth_indicators'] = facts.growth_indicators
+    
+    return update
+
+# Weights for the tenant score features, in the order score_tenants
+# lists them
+STABILITY_WEIGHTS = (0.3, 0.2, 0.2, 0.3)  # years, verified, online presence, no bankruptcy
+GROWTH_WEIGHTS = (0.4, 0.3, 0.3)  # growth indicators, positive reviews, employee count
+TENANT_SCORE_WEIGHTS = (30, 20, 20, 30)  # stability, growth, reputation, inverse risk
+
+# Recommendation for tenant scores at or above each threshold, strongest first
+RECOMMENDATION_THRESHOLDS = ((75, "Highly Recommended"), (60, "Recommended"), (40, "Proceed with Caution"))
 
-def tenant_scoring_agent(state: TenantResearchState) -> TenantResearchState:
+def adjusted_risk_score(state: TenantResearchState) -> float:
+    """Risk score with the unverified-registration penalty applied"""
+    # An unverified registration counts as one risk factor (of 10)
+    if state.is_verified:
+        return state.risk_score
+    return min(state.risk_score + 0.1, 1.0)
+
+@lru_cache(maxsize=4096)
+def _score_features(
+    years: int,
+    verified: bool,
+    social_profiles: int,
+    bankrupt: bool,
+    growth_signals: int,
+    sentiment: float,
+    has_employees: bool,
+    risk: float
+) -> Tuple[float, float, float]:
+    """Scores one feature combination; companies that look alike share the result"""
+    stability_features = (years / 10, verified, social_profiles / 4, not bankrupt)
+    growth_features = (growth_signals / 5, max(0, (sentiment - 0.5) * 2), has_employees)
+    stability = sum(map(operator.mul, STABILITY_WEIGHTS, stability_features))
+    growth = sum(map(operator.mul, GROWTH_WEIGHTS, growth_features))
+    score_features = (stability, growth, sentiment, 1 - risk)
+    return stability, growth, sum(map(operator.mul, TENANT_SCORE_WEIGHTS, score_features))
+
+def score_tenants(states: List[TenantResearchState | Dict[str, Any]]) -> List[Tuple[float, float, float]]:
+    """Scores a batch of research states as (stability, growth potential, tenant score) each"""
+    # Accepts graph output too: run_research and research_portfolio return
+    # the state's fields as a dict, which is rebuilt into the state
+    states = [TenantResearchState(**s) if isinstance(s, dict) else s for s in states]
+    # Years past ten score the same, so they are capped before the lookup
+    return [
+        _score_features(
+            min(state.years_in_business or 0, 10),
+            state.is_verified,
+            len(state.social_media_profiles),
+            state.bankruptcy_flags,
+            len(state.growth_indicators),
+            state.review_sentiment,
+            bool(state.employee_count),
+            adjusted_risk_score(state)
+        )
+        for state in states
+    ]
+
+def recommend(score: float) -> str:
+    """Maps a 0-100 tenant score to its recommendation label"""
+    for threshold, label in RECOMMENDATION_THRESHOLDS:
+        if score >= threshold:
+            return label
+    return "Not Recommended"
+
+async def tenant_scoring_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Calculates overall tenant quality scores"""
     print("📊 Calculating tenant scores...")
     
-    # Creditworthiness indicators
-    state['creditworthiness_indicators'] = []
-    
-    if state.get('estimated_revenue'):
-        state['creditworthiness_indicators'].append("Revenue data available")
-    if state.get('years_in_business', 0) > 3:
-        state['creditworthiness_indicators'].append(f"Established business ({state['years_in_business']} years)")
-    if state['is_verified']:
-        state['creditworthiness_indicators'].append("Verified business entity")
-    if state['review_sentiment'] > 0.6:
-        state['creditworthiness_indicators'].append("Positive online reputation")
-    if not state['bankruptcy_flags']:
-        state['creditworthiness_indicators'].append("No bankruptcy indicators")
-    
-    # Calculate stability score
-    stability_factors = {
-        'years_in_business': min(state.get('years_in_business', 0) / 10, 1.0) * 0.3,
-        'verified_business': 0.2 if state['is_verified'] else 0,
-        'online_presence': len(state['social_media_profiles']) / 4 * 0.2,
-        'no_bankruptcy': 0.3 if not state['bankruptcy_flags'] else 0
-    }
-    state['stability_score'] = sum(stability_factors.values())
-    
-    # Calculate growth potential
-    growth_factors = {
-        'growth_indicators': len(state['growth_indicators']) / 5 * 0.4,
-        'positive_reviews': max(0, (state['review_sentiment'] - 0.5) * 2) * 0.3,
-        'employee_count': 0.3 if state.get('employee_count') else 0
-    }
-    state['growth_potential'] = sum(growth_factors.values())
-    
-    # Calculate overall tenant score (0-100)
-    score_components = {
-        'stability': state['stability_score'] * 30,
-        'growth': state['growth_potential'] * 20,
-        'reputation': state['review_sentiment'] * 20,
-        'risk': (1 - state['risk_score']) * 30
-    }
+    update = {"messages": []}
     
-    state['overall_tenant_score'] = sum(score_components.values())
+    risk_score = update['risk_score'] = adjusted_risk_score(state)
+    years_in_business = state.years_in_business or 0
     
-    # Determine recommendation
-    if state['overall_tenant_score'] >= 75:
-        state['recommendation'] = "Highly Recommended"
-    elif state['overall_tenant_score'] >= 60:
-        state['recommendation'] = "Recommended"
-    elif state['overall_tenant_score'] >= 40:
-        state['recommendation'] = "Proceed with Caution"
-    else:
-        state['recommendation'] = "Not Recommended"
+    # Creditworthiness indicators
+    update['creditworthiness_indicators'] = []
+    
+    if state.estimated_revenue:
+        update['creditworthiness_indicators'].append("Revenue data available")
+    if years_in_business > 3:
+        update['creditworthiness_indicators'].append(f"Established business ({years_in_business} years)")
+    if state.is_verified:
+        update['creditworthiness_indicators'].append("Verified business entity")
+    if state.review_sentiment > 0.6:
+        update['creditworthiness_indicators'].append("Positive online reputation")
+    if not state.bankruptcy_flags:
+        update['creditworthiness_indicators'].append("No bankruptcy indicators")
+    
+    # Calculate stability, growth potential and the overall tenant score (0-100)
+    [(stability_score, growth_potential, overall_tenant_score)] = score_tenants([state])
+    update['stability_score'] = stability_score
+    update['growth_potential'] = growth_potential
+    update['overall_tenant_score'] = overall_tenant_score
+    update['recommendation'] = recommend(overall_tenant_score)
     
     # Identify key concerns and positive factors
-    state['key_concerns'] = []
-    state['positive_factors'] = []
+    update['key_concerns'] = []
+    update['positive_factors'] = []
     
     # Concerns
-    if state['risk_score'] > 0.5:
-        state['key_concerns'].append("High risk score")
-    if state['bankruptcy_flags']:
-        state['key_concerns'].append("Bankruptcy indicators present")
-    if not state['is_verified']:
-        state['key_concerns'].append("Business registration not verified")
-    if state.get('years_in_business', 0) < 2:
-        state['key_concerns'].append("New business (less than 2 years)")
+    if risk_score > 0.5:
+        update['key_concerns'].append("High risk score")
+    if state.bankruptcy_flags:
+        update['key_concerns'].append("Bankruptcy indicators present")
+    if not state.is_verified:
+        update['key_concerns'].append("Business registration not verified")
+    if years_in_business < 2:
+        update['key_concerns'].append("New business (less than 2 years)")
     
     # Positive factors
-    if state['stability_score'] > 0.7:
-        state['positive_factors'].append("High stability score")
-    if state['growth_indicators']:
-        state['positive_factors'].append("Positive growth indicators")
-    if state['review_sentiment'] > 0.7:
-        state['positive_factors'].append("Excellent online reputation")
-    if state.get('years_in_business', 0) > 5:
-        state['positive_factors'].append("Well-established business")
-    
-    state['messages'].append(f"✓ Overall tenant score: {state['overall_tenant_score']:.1f}/100")
-    state['messages'].append(f"✓ Recommendation: {state['recommendation']}")
-    
-    return state
+    if update['stability_score'] > 0.7:
+        update['positive_factors'].append("High stability score")
+    if state.growth_indicators:
+        update['positive_factors'].append("Positive growth indicators")
+    if state.review_sentiment > 0.7:
+        update['positive_factors'].append("Excellent online reputation")
+    if years_in_business > 5:
+        update['positive_factors'].append("Well-established business")
+    
+    update['messages'].append(f"✓ Overall tenant score: {update['overall_tenant_score']:.1f}/100")
+    update['messages'].append(f"✓ Recommendation: {update['recommendation']}")
+    
+    return update
 
-def report_generator_agent(state: TenantResearchState) -> TenantResearchState:
+async def report_generator_agent(state: TenantResearchState) -> Dict[str, Any]:
     """Generates comprehensive tenant evaluation report"""
     print("📝 Generating comprehensive report...")
     
     # Calculate confidence level based on data completeness
     data_points = [
-        state.get('website_url'),
-        state.get('social_media_profiles'),
-        state.get('years_in_business'),
-        state.get('estimated_revenue'),
-        state.get('employee_count'),
-        state['is_verified']
+        state.website_url,
+        state.social_media_profiles,
+        state.years_in_business,
+        state.estimated_revenue,
+        state.employee_count,
+        state.is_verified
     ]
-    state['confidence_level'] = sum(1 for dp in data_points if dp) / len(data_points)
-    
-    # Generate executive summary
-    state['executive_summary'] = f"""
-TENANT EVALUATION REPORT - {state['company_name']}
-{'='*60}
-
-📍 Location: {state['location']}
-🏢 Industry: {state.get('industry', 'Not specified')}
-📅 Years in Business: {state.get('years_in_business', 'Unknown')}
-🏛️ Business Type: {state.get('business_type', 'Unknown')}
-
-OVERALL ASSESSMENT: {state['recommendation']}
-Tenant Score: {state['overall_tenant_score']:.1f}/100
-
-KEY METRICS:
-• Stability Score: {state['stability_score']:.2f}/1.0
-• Growth Potential: {state['growth_potential']:.2f}/1.0
-• Risk Score: {state['risk_score']:.2f}/1.0 (lower is better)
-• Online Reputation: {state['review_sentiment']:.2f}/1.0
-
-FINANCIAL INDICATORS:
-• Estimated Revenue: {state.get('estimated_revenue', 'Not available')}
-• Employee Count: {state.get('employee_count', 'Not available')}
-• Growth Indicators: {len(state['growth_indicators'])} positive signals
-
-VERIFICATION STATUS:
-• Business Registration: {'✓ Verified' if state['is_verified'] else '⚠️ Not Verified'}
-• Online Presence: {len(state['social_media_profiles'])} social profiles found
-• Current Locations: {len(state['current_locations'])} found
-
-🟢 POSITIVE FACTORS:
-{chr(10).join(f'• {factor}' for factor in state['positive_factors']) if state['positive_factors'] else '• No significant positive factors identified'}
-
-🔴 KEY CONCERNS:
-{chr(10).join(f'• {concern}' for concern in state['key_concerns']) if state['key_concerns'] else '• No significant concerns identified'}
-
-📊 Data Confidence Level: {state['confidence_level']*100:.0f}%
-📚 Data Sources: {len(set(state['data_sources']))} sources consulted
-🔍 Searches Performed: {len(state['search_queries_used'])}
-
-RECOMMENDATION RATIONALE:
-{_generate_rationale(state)}
-"""
-    
-    state['messages'].append("✓ Report generation complete")
-    
-    return state
+    confidence_level = sum(1 for dp in data_points if dp) / len(data_points)
+    
+    # Generate executive summary, assembled line by line
+    positive_factors = state.positive_factors or ["No significant positive factors identified"]
+    key_concerns = state.key_concerns or ["No significant concerns identified"]
+    verification = '✓ Verified' if state.is_verified else '⚠️ Not Verified'
+    
+    parts = [
+        "",
+        f"TENANT EVALUATION REPORT - {state.company_name}",
+        "=" * 60,
+        "",
+        f"📍 Location: {state.location}",
+        f"🏢 Industry: {state.industry or 'Not specified'}",
+        f"📅 Years in Business: {'Unknown' if state.years_in_business is None else state.years_in_business}",
+        f"🏛️ Business Type: {state.business_type or 'Unknown'}",
+        "",
+        f"OVERALL ASSESSMENT: {state.recommendation}",
+        f"Tenant Score: {state.overall_tenant_score:.1f}/100",
+        "",
+        "KEY METRICS:",
+        f"• Stability Score: {state.stability_score:.2f}/1.0",
+        f"• Growth Potential: {state.growth_potential:.2f}/1.0",
+        f"• Risk Score: {state.risk_score:.2f}/1.0 (lower is better)",
+        f"• Online Reputation: {state.review_sentiment:.2f}/1.0",
+        "",
+        "FINANCIAL INDICATORS:",
+        f"• Estimated Revenue: {state.estimated_revenue or 'Not available'}",
+        f"• Employee Count: {state.employee_count or 'Not available'}",
+        f"• Growth Indicators: {len(state.growth_indicators)} positive signals",
+        "",
+        "VERIFICATION STATUS:",
+        f"• Business Registration: {verification}",
+        f"• Online Presence: {len(state.social_media_profiles)} social profiles found",
+        f"• Current Locations: {len(state.current_locations)} found",
+        "",
+        "🟢 POSITIVE FACTORS:"
+    ]
+    parts.extend(f"• {factor}" for factor in positive_factors)
+    parts.append("")
+    parts.append("🔴 KEY CONCERNS:")
+    parts.extend(f"• {concern}" for concern in key_concerns)
+    parts.extend([
+        "",
+        f"📊 Data Confidence Level: {confidence_level*100:.0f}%",
+        f"📚 Data Sources: {len(state.data_sources)} sources consulted",
+        f"🔍 Searches Performed: {len(state.search_queries_used)}",
+        "",
+        "RECOMMENDATION RATIONALE:",
+        _generate_rationale(state),
+        ""
+    ])
+    executive_summary = "\n".join(parts)
+    
+    return {
+        "confidence_level": confidence_level,
+        "executive_summary": executive_summary,
+        "messages": ["✓ Report generation complete"]
+    }
 
-def _generate_rationale(state: TenantResearchState) -> str:
-    """Helper function to generate recommendation rationale"""
-    if state['recommendation'] == "Highly Recommended":
-        return f"""
+RATIONALES = {
+    "Highly Recommended": """
 This tenant demonstrates excellent potential with strong stability indicators
 and minimal risk factors. The business appears well-established with positive
 growth trajectory and good online reputation.
-"""
-    elif state['recommendation'] == "Recommended":
-        return f"""
+""",
+    "Recommended": """
 This tenant shows good potential with acceptable risk levels. While there may
 be some minor concerns, the overall profile suggests a reliable tenant with
 reasonable financial stability.
-"""
-    elif state['recommendation'] == "Proceed with Caution":
-        return f"""
+""",
+    "Proceed with Caution": """
 This tenant presents moderate risk factors that warrant additional due diligence.
 Consider requiring additional financial guarantees or shorter initial lease terms.
 Key concerns should be addressed before finalizing any agreements.
-"""
-    else:
-        return f"""
+""",
+    "Not Recommended": """
 This tenant presents significant risk factors that suggest they may not be
 suitable for your property. Multiple red flags were identified during the
 research process. Recommend seeking alternative tenants.
 """
+}
+
+def _generate_rationale(state: TenantResearchState) -> str:
+    """Helper function to generate recommendation rationale"""
+    return RATIONALES.get(state.recommendation, RATIONALES["Not Recommended"])
+
+async def run_research(
+    graph,
+    initial_state: TenantResearchState,
+    on_message: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """Runs the research graph with a search cache and HTTP client scoped to this run"""
+    token = search_cache.set({})
+    try:
+        async with pooled_http_client():
+            # Progress messages are handed to on_message as each node finishes,
+            # rather than only being available once the whole run is done
+            final_state = None
+            async for mode, chunk in graph.astream(initial_state, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                elif on_message:
+                    for update in chunk.values():
+                        for message in (update or {}).get('messages', []):
+                            on_message(message)
+            return final_state
+    finally:
+        search_cache.reset(token)
+
+# Maximum companies researched at once when screening a portfolio
+MAX_CONCURRENCY = 10
+
+async def research_portfolio(graph, companies: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Researches many companies concurrently, returning final states in input order"""
+    # Each company's searches, LLM extraction and scoring overlap with the
+    # others'; every run still gets its own search cache, and all of them
+    # share one pooled HTTP client
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    async def research(company: Dict[str, str]) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_research(
+                graph,
+                TenantResearchState(company_name=company['name'], location=company['location'])
+            )
+    
+    async with pooled_http_client():
+        return await asyncio.gather(*(research(company) for company in companies))
 
 # Build the LangGraph workflow
 def create_tenant_research_graph():
@@ -601,17 +836,25 @@ def create_tenant_research_graph():
     builder.add_node("financial_indicators", financial_indicators_agent)
     builder.add_node("real_estate_history", real_estate_history_agent)
     builder.add_node("risk_assessment", risk_assessment_agent)
+    builder.add_node("batch_extract", batch_extract_agent)
     builder.add_node("tenant_scoring", tenant_scoring_agent)
     builder.add_node("report_generator", report_generator_agent)
     
-    # Define the flow
-    builder.add_edge(START, "company_identifier")
-    builder.add_edge("company_identifier", "online_presence")
-    builder.add_edge("online_presence", "business_verification")
-    builder.add_edge("business_verification", "financial_indicators")
-    builder.add_edge("financial_indicators", "real_estate_history")
-    builder.add_edge("real_estate_history", "risk_assessment")
-    builder.add_edge("risk_assessment", "tenant_scoring")
+    # Define the flow: the research agents only need the company name and
+    # location, so every search runs in one step and joins for a single
+    # LLM extraction
+    research_agents = [
+        "company_identifier",
+        "online_presence",
+        "business_verification",
+        "financial_indicators",
+        "real_estate_history",
+        "risk_assessment"
+    ]
+    for agent in research_agents:
+        builder.add_edge(START, agent)
+    builder.add_edge(research_agents, "batch_extract")
+    builder.add_edge("batch_extract", "tenant_scoring")
     builder.add_edge("tenant_scoring", "report_generator")
     builder.add_edge("report_generator", END)
     
@@ -656,54 +899,22 @@ if __name__ == "__main__":
             print(f"\n🔍 Researching: {company['name']} - {company['location']}")
             print("-" * 60)
             
-            initial_state = {
-                "company_name": company['name'],
-                "location": company['location'],
-                "industry": "",
-                "website_url": None,
-                "social_media_profiles": {},
-                "online_reviews": [],
-                "review_sentiment": 0.5,
-                "business_registration": {},
-                "years_in_business": None,
-                "business_type": "",
-                "is_verified": False,
-                "estimated_revenue": None,
-                "employee_count": None,
-                "growth_indicators": [],
-                "current_locations": [],
-                "space_requirements": None,
-                "lease_history": [],
-                "litigation_history": [],
-                "bankruptcy_flags": False,
-                "negative_news": [],
-                "risk_score": 0.5,
-                "creditworthiness_indicators": [],
-                "stability_score": 0.0,
-                "growth_potential": 0.0,
-                "overall_tenant_score": 0.0,
-                "recommendation": "Not Recommended",
-                "executive_summary": "",
-                "detailed_report": "",
-                "key_concerns": [],
-                "positive_factors": [],
-                "messages": [],
-                "data_sources": [],
-                "search_queries_used": [],
-                "confidence_level": 0.0
-            }
+            initial_state = TenantResearchState(
+                company_name=company['name'],
+                location=company['location']
+            )
             
             try:
-                # Run the research workflow
-                result = graph.invoke(initial_state)
+                # Run the research workflow, showing each step as it lands
+                print("\n🔄 RESEARCH PROCESS:")
+                result = asyncio.run(run_research(
+                    graph,
+                    initial_state,
+                    on_message=lambda msg: print(f"  {msg}", flush=True)
+                ))
                 
                 # Display executive summary
                 print(result['executive_summary'])
-                
-                # Show workflow steps
-                print("\n🔄 RESEARCH PROCESS:")
-                for msg in result['messages'][-10:]:  # Show last 10 messages
-                    print(f"  {msg}")
                     
             except Exception as e:
                 print(f"Error: {e}")
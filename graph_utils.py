@@ -0,0 +1,28 @@
+"""
+Shared helpers for the LangGraph demos
+"""
+
+import os
+import hashlib
+
+def save_graph_png(graph, mermaid: str, path: str):
+    """Renders the graph PNG unless the topology matches the last render"""
+    digest = hashlib.sha256(mermaid.encode()).hexdigest()[:16]
+    digest_path = f"{path}.sha256"
+    
+    try:
+        with open(digest_path) as f:
+            if f.read() == digest and os.path.exists(path):
+                print("📊 Graph visualization unchanged, skipping render")
+                return
+    except OSError:
+        pass
+    
+    try:
+        with open(path, "wb") as f:
+            f.write(graph.get_graph().draw_mermaid_png())
+        with open(digest_path, "w") as f:
+            f.write(digest)
+        print(f"📊 Graph visualization saved as {path}")
+    except Exception as e:
+        print(f"Could not save visualization: {e}")
@@ -9,41 +9,162 @@ This demonstrates:
 """
 
 import os
-from typing import TypedDict, Literal, List, Dict, Annotated
+from typing import TypedDict, Literal, List, Dict, Annotated, Optional
 from langgraph.graph import StateGraph, START, END
+from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langgraph.types import Send
+from langchain_core.messages import HumanMessage, AIMessage, AIMessageChunk
 from langchain_openai import ChatOpenAI
-from langchain_community.tools import DuckDuckGoSearchRun
+from langchain_community.cache import SQLiteCache
 from langchain_core.tools import tool
+from langchain_core.prompts import ChatPromptTemplate
 from datetime import datetime
-import json
-from IPython.display import Image, display
+from contextvars import ContextVar
+from contextlib import asynccontextmanager
 import operator
+import asyncio
+import sqlite3
+import time
+import tiktoken
+import httpx
+from selectolax.lexbor import LexborHTMLParser
+from graph_utils import save_graph_png
+from functools import lru_cache
 
-# Initialize LLM
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# temperature=0 is deterministic, so responses are kept in an on-disk cache
+# and repeat runs on a topic skip the API round-trips
+LLM_CACHE_PATH = ".llm_cache.db"
+
+@lru_cache(maxsize=None)
+def get_llm() -> ChatOpenAI:
+    # Built on first use so the module imports without OPENAI_API_KEY set or
+    # the cache database being created
+    return ChatOpenAI(model="gpt-4o-mini", temperature=0, cache=SQLiteCache(database_path=LLM_CACHE_PATH))
+
+# Text passed on to the model is cut by token count, so the budget goes to
+# content rather than to whitespace and markup
+ANALYSIS_TOKENS = 125
+CITATION_TOKENS = 25
+
+@lru_cache(maxsize=None)
+def get_encoding() -> tiktoken.Encoding:
+    """Returns the model's tokenizer, loaded on first use"""
+    return tiktoken.encoding_for_model(get_llm().model_name)
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text down to its first max_tokens tokens"""
+    encoding = get_encoding()
+    tokens = encoding.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
 
 # Define our state
 class ResearchState(TypedDict):
     topic: str
     search_queries: List[str]
-    search_results: List[Dict]
-    key_findings: List[str]
+    search_results: Annotated[List[Dict], operator.add]
+    key_findings: Annotated[List[Dict], operator.add]
+    findings_text: str
     draft_report: str
     human_feedback: str
+    approved: bool
     final_report: str
-    messages: Annotated[List, operator.add]
+    messages: Annotated[List, add_messages]
     iteration: int
     max_iterations: int
 
+# Payload for one search-and-analyze branch
+class QueryTask(TypedDict):
+    topic: str
+    query: str
+
 # Define tools
-search = DuckDuckGoSearchRun()
+#
+# DuckDuckGo's HTML endpoint, queried through one pooled client per run so
+# searches after the first reuse open keep-alive connections
+SEARCH_URL = "https://html.duckduckgo.com/html/"
+
+# The client searches go through. httpx ties pooled connections to the event
+# loop that opened them, so a client lives only as long as the run using it
+http_client: ContextVar[Optional[httpx.AsyncClient]] = ContextVar("http_client", default=None)
+
+@asynccontextmanager
+async def pooled_http_client():
+    """Shares one pooled client across the searches made inside the block"""
+    if http_client.get() is not None:
+        yield
+        return
+    async with httpx.AsyncClient(
+        headers={"User-Agent": "Mozilla/5.0 (compatible; ResearchAssistant/1.0)"},
+        limits=httpx.Limits(max_keepalive_connections=10),
+        timeout=10.0,
+        follow_redirects=True
+    ) as client:
+        token = http_client.set(client)
+        try:
+            yield
+        finally:
+            http_client.reset(token)
+
+async def _fetch_search(query: str) -> str:
+    """Runs a DuckDuckGo search and returns the result snippets as one string"""
+    client = http_client.get()
+    if client is None:
+        # Searched outside a research run; the client serves just this query
+        async with pooled_http_client():
+            return await _fetch_search(query)
+    response = await client.post(SEARCH_URL, data={"q": query})
+    response.raise_for_status()
+    tree = LexborHTMLParser(response.content)
+    return " ".join(snippet.text(separator=" ", strip=True) for snippet in tree.css(".result__snippet"))
+
+# Search results are kept on disk for a day, so rerunning a topic (whose
+# queries come from a fixed template) does not hit DuckDuckGo again
+SEARCH_CACHE_PATH = ".search_cache.db"
+SEARCH_CACHE_TTL = 86400  # seconds
+
+def _read_cached_search(query: str) -> Optional[str]:
+    """Returns the result stored for query within SEARCH_CACHE_TTL, if any"""
+    db = sqlite3.connect(SEARCH_CACHE_PATH)
+    try:
+        db.execute("CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, result TEXT, fetched_at REAL)")
+        row = db.execute(
+            "SELECT result FROM searches WHERE query = ? AND fetched_at > ?",
+            (query, time.time() - SEARCH_CACHE_TTL)
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        db.close()
+
+def _store_search(query: str, result: str):
+    """Records a fetched result for query"""
+    db = sqlite3.connect(SEARCH_CACHE_PATH)
+    try:
+        with db:
+            db.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?)", (query, result, time.time()))
+    finally:
+        db.close()
+
+async def cached_search(query: str) -> str:
+    """Runs a DuckDuckGo search, reusing a result fetched within SEARCH_CACHE_TTL"""
+    # sqlite3 blocks, so the cache is read and written on a worker thread
+    # while the other search branches keep running on the loop
+    cached = await asyncio.to_thread(_read_cached_search, query)
+    if cached:
+        return cached
+    
+    result = await _fetch_search(query)
+    # An empty page (throttled or blocked) is not worth remembering for a day
+    if result:
+        await asyncio.to_thread(_store_search, query, result)
+    return result
 
 @tool
-def web_search(query: str) -> str:
+async def web_search(query: str) -> str:
     """Search the web for information"""
-    return search.run(query)
+    return await cached_search(query)
 
 @tool
 def analyze_content(content: str, focus: str) -> str:
@@ -54,22 +175,47 @@ def analyze_content(content: str, focus: str) -> str:
 @tool
 def generate_citation(source: str, content: str) -> str:
     """Generate a proper citation for a source"""
-    return f"[{datetime.now().year}] {source}: {content[:100]}..."
+    return f"[{datetime.now().year}] {source}: {truncate_tokens(content, CITATION_TOKENS)}..."
 
-# Define agent nodes
-def research_planner(state: ResearchState) -> ResearchState:
-    """Plans the research approach and generates search queries"""
-    print("🎯 Research Planner: Creating research strategy...")
+# Prompt templates, parsed once at import; nodes only fill in the variables
+ANALYSIS_TEMPLATE = """
+    Analyze this content and extract 2-3 key findings about {topic}:
+    {content}
     
-    prompt = f"""
-    Create a research plan for the topic: {state['topic']}
-    Generate 3-5 specific search queries that would help gather comprehensive information.
-    Return as a JSON list of queries.
+    Format as bullet points.
     """
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([("system", ANALYSIS_TEMPLATE)])
+
+REPORT_TEMPLATE = """
+    Write a comprehensive research report on: {topic}
+    
+    Based on these findings:
+    {findings_text}
     
-    response = llm.invoke([SystemMessage(content=prompt)])
+    Structure:
+    1. Executive Summary
+    2. Key Findings
+    3. Analysis
+    4. Recommendations
+    5. Conclusion
+    
+    Keep it concise but informative (300-500 words).
+    """
+REPORT_PROMPT = ChatPromptTemplate.from_messages([("system", REPORT_TEMPLATE)])
+REVISION_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "\n    Previous feedback to incorporate: {human_feedback}\n    " + REPORT_TEMPLATE)
+])
+
+# Define agent nodes
+#
+# Research runs as one branch per query, so nodes return only the fields
+# they change; the list fields are merged by their reducers
+
+def research_planner(state: ResearchState) -> Dict:
+    """Plans the research approach and generates search queries"""
+    print("🎯 Research Planner: Creating research strategy...")
     
-    # Parse queries (simplified for demo)
+    # Queries come from a fixed template (simplified for demo)
     queries = [
         f"{state['topic']} latest research",
         f"{state['topic']} industry trends 2024",
@@ -78,122 +224,133 @@ def research_planner(state: ResearchState) -> ResearchState:
         f"{state['topic']} future predictions"
     ]
     
-    state['search_queries'] = queries
-    state['messages'].append(AIMessage(content=f"Generated {len(queries)} search queries"))
-    return state
+    return {
+        "search_queries": queries,
+        "messages": [AIMessage(content=f"Generated {len(queries)} search queries")]
+    }
 
-def web_researcher(state: ResearchState) -> ResearchState:
-    """Executes web searches and collects information"""
-    print("🔍 Web Researcher: Searching for information...")
-    
-    results = []
-    for query in state['search_queries'][:3]:  # Limit to 3 for demo
-        try:
-            result = search.run(query)
-            results.append({
-                'query': query,
-                'content': result,
-                'timestamp': datetime.now().isoformat()
-            })
-        except Exception as e:
-            print(f"Error searching for {query}: {e}")
-    
-    state['search_results'] = results
-    state['messages'].append(AIMessage(content=f"Found {len(results)} search results"))
-    return state
+def dispatch_research(state: ResearchState) -> List[Send]:
+    """Fans out one search-and-analyze branch per query"""
+    # Repeated queries are sent once, in the order they were planned
+    queries = list(dict.fromkeys(state['search_queries']))
+    return [
+        Send("search_and_analyze", {"topic": state['topic'], "query": query})
+        for query in queries[:3]  # Limit to 3 for demo
+    ]
 
-def content_analyzer(state: ResearchState) -> ResearchState:
-    """Analyzes search results and extracts key findings"""
-    print("🧠 Content Analyzer: Extracting insights...")
+async def search_and_analyze(task: QueryTask) -> Dict:
+    """Searches one query and extracts key findings from the result"""
+    query = task['query']
+    print(f"🔍 Researcher: Searching '{query}'...")
     
-    findings = []
-    for result in state['search_results']:
-        prompt = f"""
-        Analyze this content and extract 2-3 key findings about {state['topic']}:
-        {result['content'][:500]}
-        
-        Format as bullet points.
-        """
-        
-        response = llm.invoke([SystemMessage(content=prompt)])
-        findings.append({
-            'source': result['query'],
-            'insights': response.content
-        })
+    try:
+        content = await cached_search(query)
+    except Exception as e:
+        print(f"Error searching for {query}: {e}")
+        return {}
     
-    state['key_findings'] = findings
-    state['messages'].append(AIMessage(content=f"Extracted insights from {len(findings)} sources"))
-    return state
+    prompt = ANALYSIS_PROMPT.format_messages(
+        topic=task['topic'],
+        content=truncate_tokens(content, ANALYSIS_TOKENS)
+    )
+    response = await get_llm().ainvoke(prompt)
+    return {
+        "search_results": [{
+            'query': query,
+            'content': content,
+            'timestamp': datetime.now().isoformat()
+        }],
+        "key_findings": [{
+            'source': query,
+            'insights': response.content
+        }],
+        "messages": [AIMessage(content=f"Extracted insights from '{query}'")]
+    }
 
-def report_writer(state: ResearchState) -> ResearchState:
+async def report_writer(state: ResearchState) -> Dict:
     """Writes a comprehensive report based on findings"""
     print("✍️  Report Writer: Drafting report...")
     
-    findings_text = "\n\n".join([
-        f"From '{f['source']}':\n{f['insights']}" 
-        for f in state['key_findings']
-    ])
+    # The findings are fixed once research is done, so revisions reuse the
+    # text joined for the first draft
+    update = {}
+    findings_text = state.get('findings_text')
+    if not findings_text:
+        findings_text = update['findings_text'] = "\n\n".join([
+            f"From '{f['source']}':\n{f['insights']}" 
+            for f in state['key_findings']
+        ])
     
-    prompt = f"""
-    Write a comprehensive research report on: {state['topic']}
-    
-    Based on these findings:
-    {findings_text}
-    
-    Structure:
-    1. Executive Summary
-    2. Key Findings
-    3. Analysis
-    4. Recommendations
-    5. Conclusion
-    
-    Keep it concise but informative (300-500 words).
-    """
+    # A revision folds the reviewer's feedback into the same single call
+    template = REVISION_PROMPT if state['human_feedback'] else REPORT_PROMPT
+    prompt = template.format_messages(
+        topic=state['topic'],
+        findings_text=findings_text,
+        human_feedback=state['human_feedback']
+    )
     
-    response = llm.invoke([SystemMessage(content=prompt)])
-    state['draft_report'] = response.content
-    state['messages'].append(AIMessage(content="Draft report completed"))
-    return state
+    response = await get_llm().ainvoke(prompt)
+    update['draft_report'] = response.content
+    update['messages'] = [AIMessage(content="Draft report completed")]
+    return update
 
-def human_reviewer(state: ResearchState) -> ResearchState:
+def human_reviewer(state: ResearchState) -> Dict:
     """Simulates human review and feedback"""
     print("👤 Human Reviewer: Reviewing draft...")
     
     # In a real implementation, this would wait for actual human input
     # For demo, we'll simulate feedback
+    update = {}
     if state['iteration'] == 0:
-        state['human_feedback'] = "Good start, but please add more specific examples and data points."
-        state['iteration'] += 1
+        update['human_feedback'] = "Good start, but please add more specific examples and data points."
+        update['iteration'] = state['iteration'] + 1
+        update['approved'] = False
     else:
-        state['human_feedback'] = "Approved - ready to publish!"
+        update['human_feedback'] = "Approved - ready to publish!"
+        update['approved'] = True
     
-    state['messages'].append(HumanMessage(content=state['human_feedback']))
-    return state
+    update['messages'] = [HumanMessage(content=update['human_feedback'])]
+    return update
 
-def report_finalizer(state: ResearchState) -> ResearchState:
-    """Finalizes the report based on human feedback"""
+def report_finalizer(state: ResearchState) -> Dict:
+    """Publishes the approved draft as the final report"""
     print("📄 Report Finalizer: Creating final version...")
     
-    if "Approved" in state['human_feedback']:
-        state['final_report'] = state['draft_report']
-    else:
-        prompt = f"""
-        Revise this report based on the feedback: {state['human_feedback']}
-        
-        Original report:
-        {state['draft_report']}
-        """
-        
-        response = llm.invoke([SystemMessage(content=prompt)])
-        state['final_report'] = response.content
-    
-    state['messages'].append(AIMessage(content="Report finalized"))
-    return state
+    # Feedback is applied by the writer on the revise loop, so the draft
+    # reaching here has already been approved as is
+    return {
+        "final_report": state['draft_report'],
+        "messages": [AIMessage(content="Report finalized")]
+    }
+
+# Nodes whose report text is streamed to the console as it is generated
+STREAMED_NODES = {"writer"}
+
+async def run_research(graph, initial_state: ResearchState) -> Dict:
+    """Runs the graph, printing report tokens as they arrive, and returns the final state"""
+    # In "messages" mode the model calls inside nodes stream their tokens as
+    # chunks; whole messages are the nodes' own status updates. A reply served
+    # from the LLM cache is not streamed and shows up in the final state only.
+    result = None
+    streaming = False
+    async with pooled_http_client():
+        async for mode, chunk in graph.astream(initial_state, stream_mode=["messages", "values"]):
+            if mode == "values":
+                result = chunk
+                continue
+            message, metadata = chunk
+            if isinstance(message, AIMessageChunk) and metadata.get("langgraph_node") in STREAMED_NODES:
+                print(message.content, end="", flush=True)
+                streaming = True
+            elif streaming:
+                print()
+                streaming = False
+    return result
 
 # Define routing logic
 def should_continue(state: ResearchState) -> Literal["continue", "end"]:
     """Determines if we should continue or end the workflow"""
-    if "Approved" in state.get('human_feedback', ''):
+    if state.get('approved'):
         return "end"
     elif state['iteration'] < state['max_iterations']:
         return "continue"
@@ -202,28 +359,28 @@ def should_continue(state: ResearchState) -> Literal["continue", "end"]:
 
 def route_after_human_review(state: ResearchState) -> Literal["finalize", "revise"]:
     """Routes based on human feedback"""
-    if "Approved" in state.get('human_feedback', ''):
+    if state.get('approved'):
         return "finalize"
     else:
         return "revise"
 
-# Build the graph
+# Build the graph. Compiling validates the edges and builds the executor, so
+# it is done once and every later call reuses the same compiled graph.
+@lru_cache(maxsize=None)
 def create_research_graph():
     builder = StateGraph(ResearchState)
     
     # Add nodes
     builder.add_node("planner", research_planner)
-    builder.add_node("researcher", web_researcher)
-    builder.add_node("analyzer", content_analyzer)
+    builder.add_node("search_and_analyze", search_and_analyze)
     builder.add_node("writer", report_writer)
     builder.add_node("human_review", human_reviewer)
     builder.add_node("finalizer", report_finalizer)
     
     # Add edges
     builder.add_edge(START, "planner")
-    builder.add_edge("planner", "researcher")
-    builder.add_edge("researcher", "analyzer")
-    builder.add_edge("analyzer", "writer")
+    builder.add_conditional_edges("planner", dispatch_research, ["search_and_analyze"])
+    builder.add_edge("search_and_analyze", "writer")
     builder.add_edge("writer", "human_review")
     
     # Conditional edges
@@ -245,18 +402,13 @@ if __name__ == "__main__":
     # Create the graph
     graph = create_research_graph()
     
-    # Visualize
-    try:
-        img = Image(graph.get_graph().draw_mermaid_png())
-        with open("research_assistant_graph.png", "wb") as f:
-            f.write(img.data)
-        print("📊 Graph visualization saved as research_assistant_graph.png")
-    except Exception as e:
-        print(f"Could not save visualization: {e}")
+    # Visualize; the PNG is only re-rendered when the graph changes
+    mermaid = graph.get_graph().draw_mermaid()
+    save_graph_png(graph, mermaid, "research_assistant_graph.png")
     
     # Print Mermaid diagram
     print("\n🎨 Mermaid Diagram:")
-    print(graph.get_graph().draw_mermaid())
+    print(mermaid)
     
     # Run a research task
     print("\n🚀 Starting Research Assistant Demo...")
@@ -267,8 +419,10 @@ if __name__ == "__main__":
         "search_queries": [],
         "search_results": [],
         "key_findings": [],
+        "findings_text": "",
         "draft_report": "",
         "human_feedback": "",
+        "approved": False,
         "final_report": "",
         "messages": [],
         "iteration": 0,
@@ -277,7 +431,7 @@ if __name__ == "__main__":
     
     try:
         # Run the graph
-        result = graph.invoke(initial_state)
+        result = asyncio.run(run_research(graph, initial_state))
         
         print("\n📊 Final Report:")
         print("=" * 50)
@@ -286,7 +440,7 @@ if __name__ == "__main__":
         print("\n💬 Workflow Messages:")
         for msg in result['messages']:
             print(f"- {msg.content}")
-            
+    
     except Exception as e:
         print(f"Error running graph: {e}")
         print("Note: This demo requires OpenAI API key to be set in environment")
\ No newline at end of file
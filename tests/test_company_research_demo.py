@@ -0,0 +1,12 @@
+import random
+
+import company_research_demo as research
+
+def test_quick_research_can_recommend_buy():
+    random.seed(0)
+    recommendations = {
+        research.run_company_research({"company_name": "Apple Inc.", "research_depth": "quick"})['investment_recommendation']
+        for _ in range(100)
+    }
+
+    assert "BUY" in recommendations
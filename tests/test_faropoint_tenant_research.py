@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+import faropoint_tenant_research as research
+
+SEARCH_TEXT = {
+    "Secretary": "Acme LLC registered with the state, established 2010",
+    "revenue": "$5 million in revenue, 50 employees, expanding and hiring",
+    "LinkedIn": "linkedin.com/company/acme facebook.com/acme",
+}
+
+class FakeLLM:
+    def with_structured_output(self, schema):
+        class Extractor:
+            async def ainvoke(self, messages):
+                return schema(industry="Logistics", review_rating=4.5, review_count=10, sentiment="positive")
+        return Extractor()
+
+@pytest.fixture
+def offline(monkeypatch):
+    async def fake_search(query):
+        return next((text for key, text in SEARCH_TEXT.items() if key in query), "")
+    
+    monkeypatch.setattr(research, "_fetch_search", fake_search)
+    monkeypatch.setattr(research, "get_llm", lambda: FakeLLM())
+    research.search_results.clear()
+
+def test_score_tenants_scores_portfolio_output(offline):
+    graph = research.create_tenant_research_graph()
+    companies = [
+        {"name": "Acme Logistics", "location": "Dallas, TX"},
+        {"name": "Beta Freight", "location": "Austin, TX"},
+    ]
+    final_states = asyncio.run(research.research_portfolio(graph, companies))
+    
+    scores = research.score_tenants(final_states)
+    
+    assert [score[2] for score in scores] == [state['overall_tenant_score'] for state in final_states]
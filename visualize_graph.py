@@ -1,4 +1,6 @@
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Literal
 from typing_extensions import TypedDict
 from langgraph.graph import StateGraph, START, END
@@ -20,10 +22,22 @@ def node_3(state):
     print("---Node 3---")
     return {"graph_state": state['graph_state'] +" sad!"}
 
+# Moods are drawn in batches rather than with one random() call per run,
+# which adds up when the graph is invoked in a loop
+MOOD_BATCH = 10_000
+
+def mood_stream():
+    while True:
+        yield from random.choices(("node_2", "node_3"), k=MOOD_BATCH)
+
+moods = mood_stream()
+# graph.batch runs invocations on worker threads, and a generator can only be
+# advanced by one of them at a time
+moods_lock = threading.Lock()
+
 def decide_mood(state) -> Literal["node_2", "node_3"]:
-    if random.random() < 0.5:
-        return "node_2"
-    return "node_3"
+    with moods_lock:
+        return next(moods)
 
 # Build graph
 builder = StateGraph(State)
@@ -40,24 +54,37 @@ builder.add_edge("node_3", END)
 # Compile
 graph = builder.compile()
 
-# Option 1: Save as PNG using Mermaid
-try:
+def save_png(drawable):
     from IPython.display import Image
-    img = Image(graph.get_graph().draw_mermaid_png())
+    img = Image(drawable.draw_mermaid_png())
     with open("graph_visualization.png", "wb") as f:
         f.write(img.data)
-    print("Graph saved as graph_visualization.png")
-except Exception as e:
-    print(f"Could not save as PNG: {e}")
 
-# Option 2: Print Mermaid diagram text
-print("\nMermaid diagram:")
-print(graph.get_graph().draw_mermaid())
-
-# Option 3: Save as DOT file for Graphviz
-try:
+def save_dot(drawable):
     with open("graph.dot", "w") as f:
-        f.write(graph.get_graph().draw_graphviz_dot())
-    print("\nGraph saved as graph.dot (use Graphviz to render)")
-except Exception as e:
-    print(f"Could not save as DOT: {e}")
\ No newline at end of file
+        f.write(drawable.draw_graphviz_dot())
+
+# The file exports are independent, and the PNG waits on the mermaid.ink
+# service, so the two run side by side
+drawable = graph.get_graph()
+with ThreadPoolExecutor(max_workers=2) as pool:
+    png_export = pool.submit(save_png, drawable)
+    dot_export = pool.submit(save_dot, drawable)
+    
+    # Option 1: Save as PNG using Mermaid
+    try:
+        png_export.result()
+        print("Graph saved as graph_visualization.png")
+    except Exception as e:
+        print(f"Could not save as PNG: {e}")
+    
+    # Option 2: Print Mermaid diagram text
+    print("\nMermaid diagram:")
+    print(drawable.draw_mermaid())
+    
+    # Option 3: Save as DOT file for Graphviz
+    try:
+        dot_export.result()
+        print("\nGraph saved as graph.dot (use Graphviz to render)")
+    except Exception as e:
+        print(f"Could not save as DOT: {e}")
\ No newline at end of file